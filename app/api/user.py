@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from models import db, User, UserRole
+from services.serializers import serialize_user
 
 api_user_bp = Blueprint('api_user', __name__, url_prefix='/api')
 
@@ -49,7 +50,7 @@ def create_user():
         return jsonify({
             'success': True,
             'message': 'Usuário criado com sucesso!',
-            'user': user.to_dict()
+            'user': serialize_user(user)
         }), 201
         
     except Exception as e:
@@ -64,7 +65,7 @@ def create_test_user():
         if existing_user:
             return jsonify({
                 'message': 'Usuário de teste já existe!',
-                'user': existing_user.to_dict()
+                'user': serialize_user(existing_user)
             }), 200
         
         user = User(
@@ -81,7 +82,7 @@ def create_test_user():
         return jsonify({
             'success': True,
             'message': 'Usuário de teste criado!',
-            'user': user.to_dict(),
+            'user': serialize_user(user),
             'credentials': {
                 'email': 'hamielhenrique29@gmail.com',
                 'password': '123456'
@@ -12,6 +12,19 @@ sys.path.insert(0, current_dir)
 sys.path.insert(0, parent_dir)
 
 from models import db, User
+from services.user_cache import user_cache
+from services.stats import system_stats
+from services.search import search_index
+from services.passwords import password_hasher
+from services.write_behind import timestamp_buffer
+from services.sessions import init_sessions
+from services.conditional import init_conditional
+from services.fragment_cache import fragment_cache
+from services.assets import asset_manifest
+from services.serializers import init_json
+from services.sqlite_tuning import sqlite_tuning
+from services.replicas import replica_router
+from services.sql_profiler import sql_profiler
 login_manager = LoginManager()
 bcrypt = Bcrypt()
 migrate = Migrate()
@@ -25,9 +38,28 @@ def create_app():
     
     app.config.from_object('config.DevelopmentConfig')
     
+    # Sessions server-side (o cookie leva só o id assinado)
+    init_sessions(app)
+    
+    # JSON (jsonify) pelo orjson quando disponível
+    init_json(app)
+    
+    # Salt dos ETags muda a cada release
+    init_conditional(app)
+    
     db.init_app(app)
+    sqlite_tuning.init_app(app)
+    replica_router.init_app(app)
+    sql_profiler.init_app(app)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
+    timestamp_buffer.init_app(app)
+    fragment_cache.init_app(app)
+    asset_manifest.init_app(app)
+    user_cache.init_app(app)
+    system_stats.init_app(app)
+    search_index.init_app(app)
     
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
@@ -36,7 +68,8 @@ def create_app():
     
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        # Snapshot em cache (LRU + TTL), invalidado quando o User é alterado
+        return user_cache.get(int(user_id))
     
     # =============================================================================
     # REGISTRAR BLUEPRINTS - NOVA ESTRUTURA
@@ -64,6 +97,10 @@ def create_app():
     app.register_blueprint(api_user_bp)          # /api/create-user, etc
     app.register_blueprint(api_settings_bp)      # /api/user/theme, etc
     
+    # Comandos CLI (flask counters reconcile, etc)
+    from commands import register_commands
+    register_commands(app)
+    
     # =============================================================================
     # CONTEXT PROCESSORS GLOBAIS
     # =============================================================================
@@ -126,9 +163,10 @@ def create_app():
         Template filter para verificar se usuário pode acessar account
         Uso: {% if account.id|user_can_access %}
         """
-        from flask_login import current_user
-        if current_user.is_authenticated:
-            return current_user.can_access_account(account_id)
+        from services import get_access_context
+        access = get_access_context()
+        if access:
+            return access.can_access(account_id)
         return False
     
     @app.template_filter('format_date')
@@ -175,16 +213,23 @@ def create_app():
     def before_request():
         """Executado antes de cada request"""
         from flask import g, request
-        from flask_login import current_user
+        from services import get_access_context
+        
+        # Arquivos estáticos não precisam de usuário nem de session
+        if request.endpoint == 'static':
+            return
         
         # Disponibilizar informações globais
         g.request_path = request.path
         g.is_account_route = request.path.startswith('/account/')
         
-        if current_user.is_authenticated:
-            g.user_is_super_admin = current_user.is_super_admin()
-            g.user_accessible_accounts = current_user.get_accessible_accounts()
-            g.user_has_multiple_accounts = len(g.user_accessible_accounts) > 1
+        # Contexto de autorização memoizado (accounts carregadas sob demanda)
+        access = get_access_context()
+        if access:
+            g.user_is_super_admin = access.is_super_admin
+            
+            # Última atividade: coalescida em memória e gravada em lote
+            timestamp_buffer.touch(access.user_id, 'last_seen')
     
     return app
 
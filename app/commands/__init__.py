@@ -0,0 +1,22 @@
+"""
+Comandos de linha (flask <grupo> <comando>)
+"""
+
+from .assets import assets_cli
+from .counters import counters_cli
+from .export import export_cli
+from .replicas import replicas_cli
+from .search import search_cli
+from .seed import seed
+from .users import users_cli
+
+
+def register_commands(app):
+    """Registra os grupos de comandos no CLI do Flask"""
+    app.cli.add_command(assets_cli)
+    app.cli.add_command(counters_cli)
+    app.cli.add_command(export_cli)
+    app.cli.add_command(replicas_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(seed)
+    app.cli.add_command(users_cli)
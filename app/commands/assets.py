@@ -0,0 +1,17 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from services.assets import build, vendor
+
+assets_cli = AppGroup('assets', help='Pipeline de arquivos estáticos')
+
+
+@assets_cli.command('build')
+@click.option('--vendor/--no-vendor', 'fetch_vendor', default=True,
+              help='Baixar boxicons e Poppins para static/vendor antes do build')
+def build_assets(fetch_vendor):
+    """Gera static/dist com nomes por hash, .gz/.br e manifest.json"""
+    static_folder = current_app.static_folder
+    if fetch_vendor and not vendor(static_folder, log=click.echo):
+        click.echo('ℹ️ Assets não baixados continuam sendo servidos pela CDN')
+    build(static_folder, log=click.echo)
\ No newline at end of file
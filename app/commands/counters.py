@@ -0,0 +1,22 @@
+import click
+from flask.cli import AppGroup
+from models import db, reconcile_membership_counters
+
+counters_cli = AppGroup('counters', help='Contadores desnormalizados de memberships')
+
+
+@counters_cli.command('reconcile')
+@click.option('--dry-run', is_flag=True, help='Só mostra quantas linhas divergem, sem gravar')
+def reconcile(dry_run):
+    """Recalcula member_count, admin_role_count e account_count a partir de user_accounts"""
+    try:
+        fixed = reconcile_membership_counters()
+        if dry_run:
+            db.session.rollback()
+            click.echo(f'🔍 {fixed} linha(s) com contadores divergentes')
+        else:
+            db.session.commit()
+            click.echo(f'✅ {fixed} linha(s) corrigida(s)')
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(f'Erro ao reconciliar contadores: {e}')
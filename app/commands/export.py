@@ -0,0 +1,58 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from services.export import EXPORT_FORMATS, build_export_query, stream_export
+
+export_cli = AppGroup('export', help='Exportação de dados em streaming (NDJSON/CSV)')
+
+
+def export_options(f):
+    """Opções comuns a todos os datasets"""
+    f = click.option('--batch-size', type=int, default=None,
+                     help='Linhas por lote lido do cursor (padrão: EXPORT_BATCH_SIZE)')(f)
+    f = click.option('--output', '-o', type=click.Path(dir_okay=False, allow_dash=True), default='-',
+                     show_default=True, help='Arquivo de saída ("-" para stdout)')(f)
+    f = click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default='ndjson',
+                     show_default=True)(f)
+    return f
+
+
+def run_export(dataset, fmt, output, batch_size, **filters):
+    batch_size = batch_size or current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    query = build_export_query(dataset, **filters)
+    size = 0
+    with click.open_file(output, 'wb') as out:
+        for chunk in stream_export(query, fmt, batch_size):
+            out.write(chunk)
+            size += len(chunk)
+    # Mensagem no stderr para não misturar com os dados quando a saída é stdout
+    click.echo(f'✅ {dataset}: {size / 1024:.1f} KB em {output}', err=True)
+
+
+@export_cli.command('users')
+@export_options
+@click.option('--search', default='', help='Mesmo filtro de busca da listagem')
+@click.option('--role', default='', help='super_admin, administrador ou user')
+def export_users(fmt, output, batch_size, search, role):
+    """Exporta usuários"""
+    run_export('users', fmt, output, batch_size, search=search, role=role)
+
+
+@export_cli.command('accounts')
+@export_options
+@click.option('--search', default='', help='Mesmo filtro de busca da listagem')
+@click.option('--status', default='', help='active, suspended ou inactive')
+def export_accounts(fmt, output, batch_size, search, status):
+    """Exporta accounts"""
+    run_export('accounts', fmt, output, batch_size, search=search, status=status)
+
+
+@export_cli.command('memberships')
+@export_options
+@click.option('--account-id', type=int, default=None)
+@click.option('--user-id', type=int, default=None)
+@click.option('--role', default='', help='Role na account (owner, admin, user)')
+def export_memberships(fmt, output, batch_size, account_id, user_id, role):
+    """Exporta os vínculos usuário/account (user_accounts)"""
+    run_export('memberships', fmt, output, batch_size,
+               account_id=account_id, user_id=user_id, role=role)
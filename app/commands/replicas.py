@@ -0,0 +1,28 @@
+import click
+from flask.cli import AppGroup
+from models import db
+from services.replicas import replica_router
+
+replicas_cli = AppGroup('replicas', help='Réplicas de leitura (REPLICA_BINDS)')
+
+
+@replicas_cli.command('status')
+def status():
+    """Lista as réplicas configuradas"""
+    if not replica_router.enabled:
+        click.echo('ℹ️ Nenhuma réplica configurada (DATABASE_REPLICA_URLS)')
+        return
+    click.echo(f'🗄️ primário: {db.engines[None].url.render_as_string(hide_password=True)}')
+    for bind in replica_router.binds:
+        click.echo(f'📖 {bind}: {db.engines[bind].url.render_as_string(hide_password=True)}')
+    click.echo(f'⏱️ leituras no primário por {replica_router.sticky_seconds}s após uma escrita')
+
+
+@replicas_cli.command('sync')
+def sync():
+    """Copia o banco SQLite primário para as réplicas SQLite (teste local)"""
+    synced = replica_router.sync_sqlite()
+    if not synced:
+        raise click.ClickException('Nenhuma réplica SQLite para sincronizar (primário e réplicas precisam ser SQLite)')
+    for bind in synced:
+        click.echo(f'✅ {bind} sincronizada')
@@ -0,0 +1,26 @@
+import click
+from flask.cli import AppGroup
+from models import db
+from services.search import search_index
+
+search_cli = AppGroup('search', help='Índices de busca de usuários e accounts')
+
+
+@search_cli.command('install')
+def install():
+    """Cria os índices de busca (FTS5 no SQLite, pg_trgm no PostgreSQL)"""
+    with db.engine.begin() as connection:
+        if not search_index.install(connection):
+            raise click.ClickException(f'Banco {connection.dialect.name} não suportado')
+        search_index.rebuild(connection)
+    click.echo('✅ Índices de busca instalados')
+
+
+@search_cli.command('rebuild')
+def rebuild():
+    """Reconstrói o conteúdo dos índices FTS5 a partir das tabelas"""
+    with db.engine.begin() as connection:
+        if search_index.rebuild(connection):
+            click.echo('✅ Índices de busca reconstruídos')
+        else:
+            click.echo('ℹ️ Nada a reconstruir (índices pg_trgm são mantidos pelo PostgreSQL)')
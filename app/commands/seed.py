@@ -0,0 +1,35 @@
+import time
+
+import click
+from flask.cli import with_appcontext
+from services.seed import Seeder
+
+
+@click.command('seed')
+@click.option('--accounts', type=int, default=100, show_default=True)
+@click.option('--users', type=int, default=10000, show_default=True)
+@click.option('--members-per-account', type=int, default=10, show_default=True,
+              help='Média de membros por account (com o owner)')
+@click.option('--super-admins', type=int, default=1, show_default=True)
+@click.option('--admin-ratio', type=float, default=0.1, show_default=True,
+              help='Fração dos membros com role admin na account')
+@click.option('--password', default='senha123', show_default=True, help='Senha de todos os usuários gerados')
+@click.option('--batch-size', type=int, default=50000, show_default=True, help='Linhas por transação')
+@click.option('--seed', 'random_seed', type=int, default=None, help='Semente do gerador (dataset reproduzível)')
+@with_appcontext
+def seed(accounts, users, members_per_account, super_admins, admin_ratio, password, batch_size, random_seed):
+    """Popula o banco com dados sintéticos para testes de carga"""
+    try:
+        seeder = Seeder(accounts=accounts, users=users, members_per_account=members_per_account,
+                        super_admins=super_admins, admin_ratio=admin_ratio, password=password,
+                        batch_size=batch_size, seed=random_seed)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    started = time.perf_counter()
+    try:
+        report = seeder.run(log=click.echo)
+    except Exception as e:
+        raise click.ClickException(f'Erro ao popular o banco: {e}')
+    click.echo(f'🌱 {report.users} usuários, {report.accounts} accounts e {report.memberships} memberships '
+               f'em {time.perf_counter() - started:.1f}s')
@@ -0,0 +1,59 @@
+import json
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from models import db, Account
+from services.user_import import UserImporter, iter_rows
+
+users_cli = AppGroup('users', help='Gerenciamento de usuários')
+
+
+@users_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Formato do arquivo (padrão: pela extensão)')
+@click.option('--account-id', type=int, default=None, help='Associar os usuários a esta account')
+@click.option('--role-in-account', type=click.Choice(['user', 'admin']), default='user',
+              help='Role dos usuários na account')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='Linhas por transação')
+@click.option('--workers', type=int, default=None, help='Processos para hash bcrypt (padrão: nº de CPUs)')
+@click.option('--errors-file', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Grava os erros por linha em JSONL')
+def import_users(path, fmt, account_id, role_in_account, batch_size, workers, errors_file):
+    """Importa usuários de um arquivo CSV ou JSONL"""
+    if fmt is None:
+        fmt = 'jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson') else 'csv'
+
+    account = None
+    if account_id is not None:
+        account = db.session.get(Account, account_id)
+        if account is None:
+            raise click.ClickException(f'Account {account_id} não encontrada')
+
+    importer = UserImporter(
+        batch_size=batch_size,
+        workers=workers or os.cpu_count(),
+        rounds=current_app.config.get('BCRYPT_LOG_ROUNDS', 12),
+        account=account,
+        role_in_account=role_in_account
+    )
+
+    with open(path, 'rb') as stream:
+        report = importer.run(iter_rows(stream, fmt))
+
+    click.echo(f'✅ Criados: {report.created}')
+    click.echo(f'⏭️ Ignorados (email duplicado): {report.skipped}')
+    if account is not None:
+        click.echo(f'🏢 Associados à account {account.name}: {report.attached}')
+    click.echo(f'❌ Com erro: {report.failed}')
+
+    if errors_file and report.errors:
+        with open(errors_file, 'w', encoding='utf-8') as out:
+            for error in report.errors:
+                out.write(json.dumps(error, ensure_ascii=False) + '\n')
+        click.echo(f'📄 Erros gravados em {errors_file}')
+    else:
+        for error in report.errors[:20]:
+            click.echo(f"   linha {error['line']} ({error['email'] or '-'}): {error['error']}")
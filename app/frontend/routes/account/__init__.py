@@ -1,7 +1,12 @@
 from flask import Blueprint, request, redirect, url_for, flash, abort, g
 from flask_login import login_required, current_user
 from functools import wraps
-from models import Account, AccountStatus
+from werkzeug.local import LocalProxy
+from models import db, Account, AccountStatus, User
+from services import get_access_context
+from services.sessions import set_account_context
+from services.conditional import conditional, membership_version
+from services.replicas import read_replica
 
 # Blueprint principal para rotas baseadas em account
 account_bp = Blueprint('account', __name__, url_prefix='/account')
@@ -20,8 +25,10 @@ def account_required(f):
             flash('Account não especificada!', 'error')
             return redirect(url_for('main.select_account'))
         
+        access = get_access_context()
+        
         # Verificar se account existe
-        account = Account.query.get(account_id)
+        account = access.get_account(account_id)
         if not account:
             flash(f'Account {account_id} não encontrada!', 'error')
             return redirect(url_for('main.select_account'))
@@ -32,18 +39,19 @@ def account_required(f):
             return redirect(url_for('main.select_account'))
         
         # Verificar se usuário tem acesso
-        if not current_user.can_access_account(account_id):
+        if not access.can_access(account_id):
             flash(f'Você não tem acesso à account {account.name}!', 'error')
             
             # Redirecionar para primeira account do usuário
-            default_account = current_user.get_default_account()
+            default_account = access.get_default_account()
             if default_account:
                 return redirect(url_for('account.dashboard', account_id=default_account.id))
             else:
                 return redirect(url_for('main.no_access'))
         
         # Definir account atual na session e no contexto global
-        current_user.set_current_account(account_id)
+        # (acesso já validado acima; só grava a session se mudou)
+        set_account_context(account, access.role_in(account))
         g.current_account = account
         
         return f(*args, **kwargs)
@@ -59,7 +67,7 @@ def admin_required(f):
     def decorated_function(*args, **kwargs):
         account = g.current_account
         
-        if not current_user.is_admin_of_account(account):
+        if not get_access_context().is_admin_of(account):
             flash(f'Você não tem privilégios de administrador na account {account.name}!', 'error')
             return redirect(url_for('account.dashboard', account_id=account.id))
         
@@ -76,7 +84,8 @@ def owner_required(f):
     def decorated_function(*args, **kwargs):
         account = g.current_account
         
-        if not current_user.is_owner_of_account(account) and not current_user.is_super_admin():
+        access = get_access_context()
+        if not access.is_owner_of(account) and not access.is_super_admin:
             flash(f'Você não é o proprietário da account {account.name}!', 'error')
             return redirect(url_for('account.dashboard', account_id=account.id))
         
@@ -88,26 +97,38 @@ def owner_required(f):
 # ROTAS PRINCIPAIS DA ACCOUNT
 # =============================================================================
 
+def _dashboard_version(account_id):
+    """Validador do dashboard: account, owner, role do usuário e memberships (switcher)"""
+    account = g.current_account
+    role = get_access_context().role_in(account)
+    owner_updated_at = db.select(User.updated_at).where(User.id == account.owner_id).scalar_subquery()
+    return (account.updated_at, role) + membership_version(owner_updated_at)
+
 @account_bp.route('/<int:account_id>/dashboard')
 @account_required
+@read_replica
+@conditional(_dashboard_version)
 def dashboard(account_id):
     """Dashboard principal da account"""
     account = g.current_account
     
-    # Estatísticas básicas da account
+    # Estatísticas básicas da account (membros carregados em uma única query)
+    members = account.get_members()
+    owner = members.owner or account.owner
     stats = {
-        'total_users': account.users.count(),
-        'admin_users': len(account.get_admins()),
-        'regular_users': len(account.get_regular_users()),
+        'total_users': len(members),
+        'admin_users': len(members.admins),
+        'regular_users': len(members.regular_users),
         'account_status': account.status.value,
         'created_at': account.created_at,
-        'owner': account.owner.get_full_name() if account.owner else 'N/A'
+        'owner': owner.get_full_name() if owner else 'N/A'
     }
     
     # Role do usuário atual nesta account
-    user_role_in_account = current_user.get_role_in_account(account)
-    is_admin = current_user.is_admin_of_account(account)
-    is_owner = current_user.is_owner_of_account(account)
+    access = get_access_context()
+    user_role_in_account = access.role_in(account)
+    is_admin = access.is_admin_of(account)
+    is_owner = access.is_owner_of(account)
     
     return render_template('account/dashboard.html',
                          account=account,
@@ -150,11 +171,15 @@ def reports(account_id):
 @account_bp.context_processor
 def inject_account_context():
     """Injeta contexto da account em todos os templates"""
+    account = getattr(g, 'current_account', None)
+    access = get_access_context()
+    
     return {
-        'current_account': getattr(g, 'current_account', None),
-        'user_accessible_accounts': current_user.get_accessible_accounts() if current_user.is_authenticated else [],
-        'is_account_admin': current_user.is_admin_of_account(getattr(g, 'current_account', None)) if current_user.is_authenticated and hasattr(g, 'current_account') else False,
-        'is_account_owner': current_user.is_owner_of_account(getattr(g, 'current_account', None)) if current_user.is_authenticated and hasattr(g, 'current_account') else False
+        'current_account': account,
+        # Proxy: a lista só é carregada se o fragmento do switcher não estiver em cache
+        'user_accessible_accounts': LocalProxy(lambda: access.accessible_accounts) if access else [],
+        'is_account_admin': access.is_admin_of(account) if access else False,
+        'is_account_owner': access.is_owner_of(account) if access else False
     }
 
 # =============================================================================
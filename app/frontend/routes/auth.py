@@ -1,9 +1,19 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, current_app
 from flask_login import login_user, logout_user, login_required, current_user
-from models import db, User, UserRole
+from sqlalchemy.orm import load_only
+from models import db, User, UserRole, Account, AccountStatus, user_accounts
+from services.passwords import PasswordHasherBusy
+from services.sessions import regenerate_session, set_account_context, clear_account_context
+from services import get_access_context
+from services.conditional import conditional, membership_version
+from services.pagination import keyset_paginate
+from services.replicas import read_replica
 
 auth_bp = Blueprint('auth', __name__)
 
+# Campos disponíveis em /user/accounts (?fields=)
+ACCOUNT_FIELDS = ('id', 'name', 'role', 'user_count', 'is_current')
+
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     if current_user.is_authenticated:
@@ -20,7 +30,19 @@ def login():
         
         user = User.query.filter_by(email=email).first()
         
-        if user and user.check_password(password):
+        try:
+            authenticated = user is not None and user.check_password(password)
+            if authenticated:
+                # Hash gerado com custo antigo: atualizar enquanto temos a senha
+                if user.rehash_password_if_needed(password):
+                    db.session.commit()
+        except PasswordHasherBusy:
+            flash('Muitas tentativas de login no momento. Tente novamente em instantes.', 'error')
+            return render_template('auth/login.html'), 503
+        
+        if authenticated:
+            # Novo id de session a cada login (contra session fixation)
+            regenerate_session()
             login_user(user, remember=remember)
             user.update_last_login()
             
@@ -29,12 +51,10 @@ def login():
             if accounts:
                 # Se tem accounts, definir a primeira como padrão
                 first_account = accounts[0]
-                session['current_account_id'] = first_account.id
-                session['current_account_name'] = first_account.name
+                set_account_context(first_account, user.get_role_in_account(first_account))
             elif user.is_super_admin():
                 # Super admin inicia em modo global
-                session.pop('current_account_id', None)
-                session.pop('current_account_name', None)
+                clear_account_context()
             
             flash(f'Bem-vindo, {user.get_full_name()}!', 'success')
             
@@ -54,8 +74,7 @@ def logout():
     user_name = current_user.get_full_name()
     
     # Limpar session
-    session.pop('current_account_id', None)
-    session.pop('current_account_name', None)
+    clear_account_context()
     
     logout_user()
     flash(f'Até logo, {user_name}!', 'info')
@@ -72,8 +91,7 @@ def switch_account():
         # Se account_id é None, entrar em modo super admin global
         if account_id is None:
             if current_user.is_super_admin():
-                session.pop('current_account_id', None)
-                session.pop('current_account_name', None)
+                clear_account_context()
                 return jsonify({
                     'success': True, 
                     'message': 'Modo Super Admin Global ativado',
@@ -84,18 +102,17 @@ def switch_account():
                 return jsonify({'success': False, 'error': 'Apenas super admin pode usar modo global'})
         
         # Verificar se o usuário pode acessar esta account
-        if not current_user.can_access_account(account_id):
+        access = get_access_context()
+        if not access.can_access(account_id):
             return jsonify({'success': False, 'error': 'Acesso negado a esta account'})
         
         # Buscar a account
-        from models import Account
-        account = Account.query.get(account_id)
+        account = access.get_account(account_id)
         if not account:
             return jsonify({'success': False, 'error': 'Account não encontrada'})
         
-        # Salvar na session
-        session['current_account_id'] = account_id
-        session['current_account_name'] = account.name
+        # Salvar o contexto validado na session (não é revalidado por request)
+        set_account_context(account, access.role_in(account))
         
         return jsonify({
             'success': True, 
@@ -149,30 +166,81 @@ def get_current_account():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _user_accounts_version():
+    """Validador do /user/accounts: memberships e parâmetros da consulta"""
+    return membership_version() + (request.query_string,)
+
 @auth_bp.route('/user/accounts', methods=['GET'])
 @login_required
+@read_replica
+@conditional(_user_accounts_version)
 def get_user_accounts():
-    """Retorna todas as accounts do usuário"""
+    """
+    Retorna as accounts do usuário (id, nome, role e nº de membros) em uma
+    única query. ?fields=id,name limita os campos retornados. Super admins
+    recebem todas as accounts ativas paginadas por cursor (?after=, ?before=,
+    ?per_page=).
+    """
+    fields = ACCOUNT_FIELDS
+    if request.args.get('fields'):
+        fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+        invalid = sorted(set(fields) - set(ACCOUNT_FIELDS))
+        if invalid:
+            return jsonify({'error': f'Campos inválidos: {", ".join(invalid)}'}), 400
+    
     try:
-        accounts = current_user.get_accounts()
-        current_account = current_user.get_current_account()
+        access = get_access_context()
+        current_account_id = session.get('current_account_id')
+        result = {'is_super_admin': access.is_super_admin}
         
-        accounts_data = []
-        for account in accounts:
-            accounts_data.append({
-                'id': account.id,
-                'name': account.name,
-                'role': current_user.get_role_in_account(account) if not current_user.is_super_admin() else 'super_admin',
-                'user_count': account.get_user_count(),
-                'is_current': current_account and account.id == current_account.id
+        if access.is_super_admin:
+            # Todas as accounts ativas: paginar em vez de carregar milhares
+            query = Account.query.filter(Account.status == AccountStatus.ACTIVE).options(
+                load_only(Account.id, Account.name, Account.member_count, Account.created_at)
+            )
+            page = keyset_paginate(
+                query, Account,
+                after=request.args.get('after'),
+                before=request.args.get('before'),
+                per_page=max(1, min(request.args.get('per_page', 50, type=int), 200)),
+                count_ttl=current_app.config.get('ADMIN_LIST_COUNT_TTL', 0),
+                count_key='user_accounts:active'
+            )
+            rows = [(account.id, account.name, 'super_admin', account.member_count) for account in page]
+            result.update({
+                'next_cursor': page.next_cursor,
+                'prev_cursor': page.prev_cursor,
+                'total_accounts': page.total if page.total is not None else len(rows)
             })
+        else:
+            # Membership + contador desnormalizado: uma query, sem COUNT por account
+            rows = db.session.execute(
+                db.select(Account.id, Account.name, user_accounts.c.role_in_account, Account.member_count)
+                .join(user_accounts, user_accounts.c.account_id == Account.id)
+                .where(user_accounts.c.user_id == current_user.id, Account.is_active.is_(True))
+                .order_by(Account.name, Account.id)
+            ).all()
+            # Contexto da session pode ter sobrevivido à revogação: vale só se ainda for membro
+            if current_account_id not in {row[0] for row in rows}:
+                current_account_id = rows[0][0] if rows else None
+            result['total_accounts'] = len(rows)
         
-        return jsonify({
-            'accounts': accounts_data,
-            'current_account_id': current_account.id if current_account else None,
-            'is_super_admin': current_user.is_super_admin(),
-            'total_accounts': len(accounts_data)
+        accounts = []
+        for account_id, name, role, member_count in rows:
+            account_data = {
+                'id': account_id,
+                'name': name,
+                'role': role,
+                'user_count': member_count,
+                'is_current': account_id == current_account_id
+            }
+            accounts.append({field: account_data[field] for field in fields})
+        
+        result.update({
+            'accounts': accounts,
+            'current_account_id': current_account_id
         })
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -1,5 +1,7 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
+from services import get_access_context
+from services.sessions import set_account_context
 
 main_bp = Blueprint('main', __name__)
 
@@ -8,7 +10,7 @@ def index():
     """Página inicial - redireciona baseado no status do usuário"""
     if current_user.is_authenticated:
         # Se usuário logado, redirecionar para dashboard da account padrão
-        default_account = current_user.get_default_account()
+        default_account = get_access_context().get_default_account()
         if default_account:
             return redirect(url_for('account.dashboard', account_id=default_account.id))
         else:
@@ -24,7 +26,7 @@ def dashboard():
     Rota legada do dashboard - redireciona para nova estrutura
     Mantida para compatibilidade
     """
-    default_account = current_user.get_default_account()
+    default_account = get_access_context().get_default_account()
     if default_account:
         return redirect(url_for('account.dashboard', account_id=default_account.id))
     else:
@@ -34,7 +36,7 @@ def dashboard():
 @login_required
 def select_account():
     """Página para selecionar account quando usuário tem múltiplas"""
-    accessible_accounts = current_user.get_accessible_accounts()
+    accessible_accounts = get_access_context().accessible_accounts
     
     # Se só tem uma account, redirecionar direto
     if len(accessible_accounts) == 1:
@@ -56,13 +58,15 @@ def no_access():
 @login_required
 def switch_account(account_id):
     """Trocar de account via URL"""
-    if current_user.can_access_account(account_id):
-        current_user.set_current_account(account_id)
+    access = get_access_context()
+    account = access.get_account(account_id) if access.can_access(account_id) else None
+    if account:
+        set_account_context(account, access.role_in(account))
         flash(f'Account alterada com sucesso!', 'success')
         return redirect(url_for('account.dashboard', account_id=account_id))
     else:
         flash('Você não tem acesso a esta account!', 'error')
-        default_account = current_user.get_default_account()
+        default_account = access.get_default_account()
         if default_account:
             return redirect(url_for('account.dashboard', account_id=default_account.id))
         else:
@@ -76,7 +80,7 @@ def switch_account(account_id):
 @login_required
 def profile():
     """Perfil do usuário (global, não específico de account)"""
-    user_accounts = current_user.get_accessible_accounts()
+    user_accounts = get_access_context().accessible_accounts
     return render_template('main/profile.html', accounts=user_accounts)
 
 @main_bp.route('/help')
@@ -105,7 +109,7 @@ def debug_accounts():
     
     from models import Account
     all_accounts = Account.query.all()
-    user_accounts = current_user.get_accessible_accounts()
+    user_accounts = get_access_context().accessible_accounts
     
     debug_info = {
         'user': current_user,
@@ -123,19 +127,21 @@ def debug_accounts():
 # CONTEXT PROCESSOR GLOBAL
 # =============================================================================
 
-@main_bp.context_processor
+@main_bp.app_context_processor
 def inject_global_context():
     """Context processor para injetar dados globais em todos os templates"""
     context = {}
     
     if current_user.is_authenticated:
+        access = get_access_context()
+        account_count = access.accessible_count
         context.update({
             'current_user_full_name': current_user.get_full_name(),
             'current_user_initials': current_user.get_initials(),
             'current_user_role': current_user.role.value,
-            'is_super_admin': current_user.is_super_admin(),
-            'user_account_count': len(current_user.get_accessible_accounts()),
-            'has_multiple_accounts': len(current_user.get_accessible_accounts()) > 1
+            'is_super_admin': access.is_super_admin,
+            'user_account_count': account_count,
+            'has_multiple_accounts': account_count > 1
         })
     
     return context
@@ -1,7 +1,9 @@
-from flask import Blueprint, abort, flash, redirect, url_for
+from flask import Blueprint, abort, flash, redirect, request, url_for
 from flask_login import login_required, current_user
 from functools import wraps
 from models import UserRole
+from services import get_access_context
+from services.replicas import read_replica
 
 # Criar blueprint principal do super admin
 super_admin_bp = Blueprint('super_admin', __name__, url_prefix='/super-admin')
@@ -17,7 +19,7 @@ def super_admin_required(f):
             flash('Você precisa estar logado!', 'error')
             return redirect(url_for('auth.login'))
         
-        if not current_user.is_super_admin():
+        if not get_access_context().is_super_admin:
             flash('Acesso negado! Área restrita para Super Admin.', 'error')
             return redirect(url_for('main.dashboard'))
         
@@ -27,26 +29,31 @@ def super_admin_required(f):
 # Rota principal do painel super admin
 @super_admin_bp.route('/')
 @super_admin_required
+@read_replica
 def dashboard():
     """Dashboard do Super Admin"""
-    from models import User, Account
+    from services import system_stats
     
-    # Estatísticas básicas
-    total_users = User.query.count()
-    total_accounts = Account.query.count()
-    super_admins = User.query.filter_by(role=UserRole.SUPER_ADMIN).count()
-    admins = User.query.filter_by(role=UserRole.ADMINISTRADOR).count()
-    
-    stats = {
-        'total_users': total_users,
-        'total_accounts': total_accounts,
-        'super_admins': super_admins,
-        'admins': admins,
-        'regular_users': total_users - super_admins - admins
-    }
+    # Estatísticas básicas (snapshot em cache, recalculado a cada SUPER_ADMIN_STATS_TTL)
+    stats = system_stats.get()
     
     return render_template('super_admin/dashboard.html', stats=stats)
 
+@super_admin_bp.route('/sql-profile', methods=['GET', 'POST'])
+@super_admin_required
+def sql_profile():
+    """Resumo do profiler de SQL por endpoint (processo atual)"""
+    from services import sql_profiler
+    
+    if request.method == 'POST':
+        sql_profiler.reset()
+        flash('Estatísticas do profiler zeradas!', 'success')
+        return redirect(url_for('super_admin.sql_profile'))
+    
+    return render_template('super_admin/sql_profile.html',
+                         profiler=sql_profiler,
+                         rows=sql_profiler.summary())
+
 # Importar outras rotas
 from .accounts import accounts_bp
 from .users import users_bp
@@ -1,26 +1,34 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
 from flask_login import current_user
-from models import db, Account, User, UserRole, AccountStatus
+from sqlalchemy.orm import selectinload
+from sqlalchemy import func, or_
+from models import db, Account, User, UserRole, AccountStatus, user_accounts
+from services.conditional import conditional
+from services.pagination import keyset_paginate
+from services.search import search_index
+from services.export import EXPORT_FORMATS, export_response
+from services.replicas import read_replica
+from services.memberships import BULK_ACTIONS, BulkMemberships
 from . import super_admin_required
 
 accounts_bp = Blueprint('accounts', __name__, url_prefix='/accounts')
 
 @accounts_bp.route('/')
 @super_admin_required
+@read_replica
 def index():
     """Lista todos os accounts"""
-    page = request.args.get('page', 1, type=int)
+    after = request.args.get('after')
+    before = request.args.get('before')
     search = request.args.get('search', '')
     status_filter = request.args.get('status', '')
     
-    query = Account.query
+    # Owner carregado em lote (uma query para a página inteira)
+    query = Account.query.options(selectinload(Account.owner))
     
-    # Filtro de busca
+    # Filtro de busca (índice FTS5/pg_trgm, com fallback para LIKE)
     if search:
-        query = query.filter(
-            (Account.name.contains(search)) |
-            (Account.subdomain.contains(search))
-        )
+        query = search_index.filter_accounts(query, search)
     
     # Filtro de status
     if status_filter:
@@ -30,16 +38,52 @@ def index():
         except ValueError:
             pass
     
-    # Paginação
-    accounts = query.order_by(Account.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
+    # Paginação por cursor (created_at, id) - sem OFFSET nem COUNT por página
+    accounts = keyset_paginate(
+        query, Account, after=after, before=before,
+        per_page=current_app.config.get('ADMIN_LIST_PER_PAGE', 20),
+        count_ttl=current_app.config.get('ADMIN_LIST_COUNT_TTL', 0),
+        count_key=f'accounts:{search}:{status_filter}'
     )
     
+    # Contagem de membros de todas as accounts da página em uma query
+    member_counts = Account.get_member_counts(account.id for account in accounts.items)
+    
     return render_template('super_admin/accounts/index.html', 
                          accounts=accounts, 
+                         member_counts=member_counts,
                          search=search, 
                          status_filter=status_filter)
 
+@accounts_bp.route('/export')
+@super_admin_required
+def export():
+    """Exporta os accounts (NDJSON ou CSV) com os filtros da listagem"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'Formato inválido: {fmt}'}), 400
+    
+    return export_response(
+        'accounts', fmt,
+        search=request.args.get('search', ''),
+        status=request.args.get('status', '')
+    )
+
+@accounts_bp.route('/memberships/export')
+@super_admin_required
+def export_memberships():
+    """Exporta os vínculos usuário/account (NDJSON ou CSV)"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'Formato inválido: {fmt}'}), 400
+    
+    return export_response(
+        'memberships', fmt,
+        account_id=request.args.get('account_id', type=int),
+        user_id=request.args.get('user_id', type=int),
+        role=request.args.get('role', '')
+    )
+
 @accounts_bp.route('/create', methods=['GET', 'POST'])
 @super_admin_required
 def create():
@@ -100,8 +144,26 @@ def create():
     
     return render_template('super_admin/accounts/create.html', users=available_users)
 
+def _account_version(account_id):
+    """Validador de view: account e maior updated_at entre membros, owner e criador"""
+    account = db.session.execute(
+        db.select(Account.updated_at, Account.owner_id, Account.created_by).where(Account.id == account_id)
+    ).first()
+    if account is None:
+        return None
+    
+    users_updated_at = db.session.execute(
+        db.select(func.max(User.updated_at)).where(or_(
+            User.id.in_(db.select(user_accounts.c.user_id).where(user_accounts.c.account_id == account_id)),
+            User.id.in_((account.owner_id, account.created_by))
+        ))
+    ).scalar()
+    return (account.updated_at, users_updated_at)
+
 @accounts_bp.route('/<int:account_id>')
 @super_admin_required
+@read_replica
+@conditional(_account_version)
 def view(account_id):
     """Ver detalhes do account"""
     account = Account.query.get_or_404(account_id)
@@ -181,6 +243,7 @@ def delete(account_id):
 
 @accounts_bp.route('/<int:account_id>/users')
 @super_admin_required
+@read_replica
 def manage_users(account_id):
     """Gerenciar usuários do account"""
     account = Account.query.get_or_404(account_id)
@@ -310,6 +373,35 @@ def transfer_ownership(account_id):
     
     return redirect(url_for('super_admin.accounts.manage_users', account_id=account_id))
 
+@accounts_bp.route('/<int:account_id>/users/bulk/<action>', methods=['POST'])
+@super_admin_required
+def bulk_users(account_id, action):
+    """
+    Adicionar, promover, rebaixar ou remover vários usuários de uma vez.
+    JSON: {"items": [id, "email", {"user_id"|"email", "role"}], "user_ids": [...],
+    "emails": [...], "role": "user"|"admin"}; retorna o resultado de cada item.
+    """
+    account = Account.query.get_or_404(account_id)
+    
+    if action not in BULK_ACTIONS:
+        return jsonify({'success': False, 'error': f'Ação inválida: {action}'}), 400
+    
+    data = request.get_json(silent=True) or {}
+    items = list(data.get('items') or []) + list(data.get('user_ids') or []) + list(data.get('emails') or [])
+    if not items:
+        return jsonify({'success': False, 'error': 'Nenhum usuário informado'}), 400
+    
+    try:
+        bulk = BulkMemberships(account, max_items=current_app.config.get('BULK_MEMBERSHIP_MAX_ITEMS', 10000))
+        report = bulk.run(action, items, default_role=data.get('role') or 'user')
+        return jsonify({'success': True, **report.to_dict()})
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)})
+
 @accounts_bp.route('/<int:account_id>/users/<int:user_id>/promote', methods=['POST'])
 @super_admin_required
 def promote_user(account_id, user_id):
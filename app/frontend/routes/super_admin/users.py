@@ -1,26 +1,33 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
-from models import db, User, UserRole
+import time
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
+from models import db, User, UserRole, Account
+from services.pagination import keyset_paginate
+from services.search import search_index
+from services.sessions import end_user_sessions
+from services.conditional import conditional
+from services.user_import import UserImporter, iter_rows
+from services.export import EXPORT_FORMATS, export_response
+from services.passwords import password_hasher
+from services.replicas import read_replica
 from . import super_admin_required
 
 users_bp = Blueprint('users', __name__, url_prefix='/users')
 
 @users_bp.route('/')
 @super_admin_required
+@read_replica
 def index():
     """Lista todos os usuários"""
-    page = request.args.get('page', 1, type=int)
+    after = request.args.get('after')
+    before = request.args.get('before')
     search = request.args.get('search', '')
     role_filter = request.args.get('role', '')
     
     query = User.query
     
-    # Filtro de busca
+    # Filtro de busca (índice FTS5/pg_trgm, com fallback para LIKE)
     if search:
-        query = query.filter(
-            (User.email.contains(search)) |
-            (User.first_name.contains(search)) |
-            (User.last_name.contains(search))
-        )
+        query = search_index.filter_users(query, search)
     
     # Filtro de role
     if role_filter:
@@ -30,9 +37,12 @@ def index():
         except ValueError:
             pass
     
-    # Paginação
-    users = query.order_by(User.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
+    # Paginação por cursor (created_at, id) - sem OFFSET nem COUNT por página
+    users = keyset_paginate(
+        query, User, after=after, before=before,
+        per_page=current_app.config.get('ADMIN_LIST_PER_PAGE', 20),
+        count_ttl=current_app.config.get('ADMIN_LIST_COUNT_TTL', 0),
+        count_key=f'users:{search}:{role_filter}'
     )
     
     return render_template('super_admin/users/index.html', 
@@ -40,6 +50,20 @@ def index():
                          search=search, 
                          role_filter=role_filter)
 
+@users_bp.route('/export')
+@super_admin_required
+def export():
+    """Exporta os usuários (NDJSON ou CSV) com os filtros da listagem"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'Formato inválido: {fmt}'}), 400
+    
+    return export_response(
+        'users', fmt,
+        search=request.args.get('search', ''),
+        role=request.args.get('role', '')
+    )
+
 @users_bp.route('/create', methods=['GET', 'POST'])
 @super_admin_required
 def create():
@@ -90,8 +114,61 @@ def create():
     
     return render_template('super_admin/users/create.html')
 
+@users_bp.route('/import', methods=['GET', 'POST'])
+@super_admin_required
+def import_users():
+    """Importar usuários em massa (CSV ou JSONL)"""
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        account_id = request.form.get('account_id', type=int)
+        role_in_account = request.form.get('role_in_account', 'user')
+        
+        if not upload or not upload.filename:
+            flash('Selecione um arquivo CSV ou JSONL!', 'error')
+            return render_template('super_admin/users/import.html')
+        
+        fmt = 'jsonl' if upload.filename.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+        account = None
+        if account_id:
+            account = Account.query.get(account_id)
+            if not account:
+                flash(f'Account {account_id} não encontrada!', 'error')
+                return render_template('super_admin/users/import.html')
+        
+        # Sem pool de processos no request: cada lote vai inteiro para o pool do password_hasher
+        importer = UserImporter(
+            hasher=password_hasher,
+            account=account,
+            role_in_account=role_in_account if role_in_account in ['user', 'admin'] else 'user',
+            max_errors=200
+        )
+        
+        try:
+            report = importer.run(iter_rows(upload.stream, fmt))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Erro ao importar: {str(e)}', 'error')
+            return render_template('super_admin/users/import.html')
+        
+        flash(f'{report.created} usuário(s) importado(s)!', 'success' if report.created else 'info')
+        return render_template('super_admin/users/import.html', report=report)
+    
+    return render_template('super_admin/users/import.html')
+
+def _user_version(user_id):
+    """Validador de view: dados do usuário e timestamps de acesso"""
+    user = db.session.execute(
+        db.select(User.updated_at, User.last_login, User.last_seen).where(User.id == user_id)
+    ).first()
+    if user is None:
+        return None
+    # "Última atividade" é relativa (time_ago): muda a cada minuto
+    return tuple(user) + (int(time.time() // 60),)
+
 @users_bp.route('/<int:user_id>')
 @super_admin_required
+@read_replica
+@conditional(_user_version)
 def view(user_id):
     """Ver detalhes do usuário"""
     user = User.query.get_or_404(user_id)
@@ -139,8 +216,10 @@ def delete(user_id):
     
     try:
         user_name = user.get_full_name()
+        user_id = user.id
         db.session.delete(user)
         db.session.commit()
+        end_user_sessions(user_id)
         flash(f'Usuário {user_name} deletado!', 'success')
     except Exception as e:
         db.session.rollback()
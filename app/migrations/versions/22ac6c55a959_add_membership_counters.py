@@ -0,0 +1,49 @@
+"""Add denormalized membership counters to accounts and users
+
+Revision ID: 22ac6c55a959
+Revises: b988497199c2
+Create Date: 2026-10-16 09:12:40.318211
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '22ac6c55a959'
+down_revision = 'b988497199c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('accounts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('member_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('admin_count', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('account_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Preencher os contadores a partir de user_accounts
+    op.execute("""
+        UPDATE accounts SET
+            member_count = (SELECT COUNT(*) FROM user_accounts
+                            WHERE user_accounts.account_id = accounts.id),
+            admin_count = (SELECT COUNT(*) FROM user_accounts
+                           WHERE user_accounts.account_id = accounts.id
+                           AND user_accounts.role_in_account IN ('admin', 'owner'))
+    """)
+    op.execute("""
+        UPDATE users SET
+            account_count = (SELECT COUNT(*) FROM user_accounts
+                             WHERE user_accounts.user_id = users.id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('account_count')
+
+    with op.batch_alter_table('accounts', schema=None) as batch_op:
+        batch_op.drop_column('admin_count')
+        batch_op.drop_column('member_count')
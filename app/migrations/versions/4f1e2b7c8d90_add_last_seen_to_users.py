@@ -0,0 +1,26 @@
+"""Add last_seen to users
+
+Revision ID: 4f1e2b7c8d90
+Revises: 9a70a15b9c4d
+Create Date: 2026-10-16 11:20:05.127344
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1e2b7c8d90'
+down_revision = '9a70a15b9c4d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_seen', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('last_seen')
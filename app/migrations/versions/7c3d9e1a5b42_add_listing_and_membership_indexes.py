@@ -0,0 +1,45 @@
+"""Add composite indexes for membership lookups and admin listings
+
+Revision ID: 7c3d9e1a5b42
+Revises: 4f1e2b7c8d90
+Create Date: 2026-10-16 15:42:18.604913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3d9e1a5b42'
+down_revision = '4f1e2b7c8d90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Lado da account em user_accounts (a PK começa por user_id)
+    op.create_index('ix_user_accounts_account_role_user', 'user_accounts',
+                    ['account_id', 'role_in_account', 'user_id'], unique=False)
+
+    # Listagens do Super Admin paginadas por (created_at, id)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_users_role_created_at_id', 'users', ['role', 'created_at', 'id'], unique=False)
+    op.create_index('ix_accounts_created_at_id', 'accounts', ['created_at', 'id'], unique=False)
+    op.create_index('ix_accounts_status_created_at_id', 'accounts', ['status', 'created_at', 'id'], unique=False)
+
+    # Estatísticas para o planner escolher os índices novos
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute('ANALYZE')
+    elif dialect == 'postgresql':
+        op.execute('ANALYZE user_accounts')
+        op.execute('ANALYZE users')
+        op.execute('ANALYZE accounts')
+
+
+def downgrade():
+    op.drop_index('ix_accounts_status_created_at_id', table_name='accounts')
+    op.drop_index('ix_accounts_created_at_id', table_name='accounts')
+    op.drop_index('ix_users_role_created_at_id', table_name='users')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_user_accounts_account_role_user', table_name='user_accounts')
@@ -0,0 +1,109 @@
+"""Add full-text search indexes for users and accounts
+
+Revision ID: 9a70a15b9c4d
+Revises: 22ac6c55a959
+Create Date: 2026-10-16 10:03:27.551904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a70a15b9c4d'
+down_revision = '22ac6c55a959'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        email, first_name, last_name,
+        content='users', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS accounts_fts USING fts5(
+        name, subdomain,
+        content='accounts', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, email, first_name, last_name)
+        VALUES (new.id, new.email, new.first_name, new.last_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, first_name, last_name)
+        VALUES ('delete', old.id, old.email, old.first_name, old.last_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF email, first_name, last_name ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, first_name, last_name)
+        VALUES ('delete', old.id, old.email, old.first_name, old.last_name);
+        INSERT INTO users_fts(rowid, email, first_name, last_name)
+        VALUES (new.id, new.email, new.first_name, new.last_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS accounts_fts_ai AFTER INSERT ON accounts BEGIN
+        INSERT INTO accounts_fts(rowid, name, subdomain)
+        VALUES (new.id, new.name, new.subdomain);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS accounts_fts_ad AFTER DELETE ON accounts BEGIN
+        INSERT INTO accounts_fts(accounts_fts, rowid, name, subdomain)
+        VALUES ('delete', old.id, old.name, old.subdomain);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS accounts_fts_au AFTER UPDATE OF name, subdomain ON accounts BEGIN
+        INSERT INTO accounts_fts(accounts_fts, rowid, name, subdomain)
+        VALUES ('delete', old.id, old.name, old.subdomain);
+        INSERT INTO accounts_fts(rowid, name, subdomain)
+        VALUES (new.id, new.name, new.subdomain);
+    END""",
+    # Indexar as linhas já existentes
+    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')",
+    "INSERT INTO accounts_fts(accounts_fts) VALUES ('rebuild')"
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS users_fts_ai",
+    "DROP TRIGGER IF EXISTS users_fts_ad",
+    "DROP TRIGGER IF EXISTS users_fts_au",
+    "DROP TRIGGER IF EXISTS accounts_fts_ai",
+    "DROP TRIGGER IF EXISTS accounts_fts_ad",
+    "DROP TRIGGER IF EXISTS accounts_fts_au",
+    "DROP TABLE IF EXISTS users_fts",
+    "DROP TABLE IF EXISTS accounts_fts"
+]
+
+POSTGRESQL_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """CREATE INDEX IF NOT EXISTS ix_users_search_trgm ON users
+        USING gin ((email || ' ' || first_name || ' ' || last_name) gin_trgm_ops)""",
+    """CREATE INDEX IF NOT EXISTS ix_accounts_search_trgm ON accounts
+        USING gin ((name || ' ' || coalesce(subdomain, '')) gin_trgm_ops)"""
+]
+
+POSTGRESQL_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_users_search_trgm",
+    "DROP INDEX IF EXISTS ix_accounts_search_trgm"
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        statements = SQLITE_UPGRADE
+    elif dialect == 'postgresql':
+        statements = POSTGRESQL_UPGRADE
+    else:
+        statements = []
+
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        statements = SQLITE_DOWNGRADE
+    elif dialect == 'postgresql':
+        statements = POSTGRESQL_DOWNGRADE
+    else:
+        statements = []
+
+    for statement in statements:
+        op.execute(statement)
@@ -0,0 +1,32 @@
+"""Rename accounts.admin_count to admin_role_count
+
+Revision ID: e51b0c7d2a63
+Revises: 7c3d9e1a5b42
+Create Date: 2026-10-16 23:40:12.275316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e51b0c7d2a63'
+down_revision = '7c3d9e1a5b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # O contador só conta memberships admin/owner; o nº de admins da account
+    # (AccountMembers) também inclui o owner e super admins membros
+    with op.batch_alter_table('accounts', schema=None) as batch_op:
+        batch_op.alter_column('admin_count', new_column_name='admin_role_count',
+                              existing_type=sa.Integer(), existing_nullable=False,
+                              existing_server_default='0')
+
+
+def downgrade():
+    with op.batch_alter_table('accounts', schema=None) as batch_op:
+        batch_op.alter_column('admin_role_count', new_column_name='admin_count',
+                              existing_type=sa.Integer(), existing_nullable=False,
+                              existing_server_default='0')
@@ -1,19 +1,24 @@
 from flask_sqlalchemy import SQLAlchemy
+from .routing import RoutingSession
 
-db = SQLAlchemy()
+# Session com roteamento de leituras para réplicas (ver services.replicas)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Importar a tabela de associação primeiro
-from .user_account import user_accounts
+from .user_account import user_accounts, ADMIN_ROLES, reconcile_membership_counters
 
 # Depois importar os modelos
 from .user import User, UserRole
-from .account import Account, AccountStatus
+from .account import Account, AccountStatus, AccountMembers
 
 __all__ = [
     'db',
     'user_accounts',
+    'ADMIN_ROLES',
+    'reconcile_membership_counters',
     'User', 
     'UserRole',
     'Account',
-    'AccountStatus'
+    'AccountStatus',
+    'AccountMembers'
 ]
\ No newline at end of file
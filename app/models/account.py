@@ -8,8 +8,46 @@ class AccountStatus(Enum):
     SUSPENDED = "suspended"
     INACTIVE = "inactive"
 
+class AccountMembers:
+    """
+    Membros de uma account particionados por role, carregados em uma única
+    query (users JOIN user_accounts)
+    """
+    
+    def __init__(self, account, rows):
+        self.roles = {}
+        self.users = []
+        self.admins = []
+        self.regular_users = []
+        self.owner = None
+        
+        for user, role in rows:
+            self.roles[user.id] = role
+            self.users.append(user)
+            
+            is_owner = user.id == account.owner_id
+            if is_owner:
+                self.owner = user
+            
+            if role in ['admin', 'owner'] or is_owner or user.is_super_admin():
+                self.admins.append(user)
+            elif role == 'user':
+                self.regular_users.append(user)
+    
+    def role_of(self, user):
+        """Retorna o role do usuário na account (ou None)"""
+        return self.roles.get(user.id)
+    
+    def __len__(self):
+        return len(self.users)
+
 class Account(db.Model):
     __tablename__ = 'accounts'
+    __table_args__ = (
+        # Listagens paginadas por (created_at, id), com e sem filtro de status
+        db.Index('ix_accounts_created_at_id', 'created_at', 'id'),
+        db.Index('ix_accounts_status_created_at_id', 'status', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -18,6 +56,13 @@ class Account(db.Model):
     status = db.Column(db.Enum(AccountStatus), nullable=False, default=AccountStatus.ACTIVE)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     
+    # Contadores desnormalizados, mantidos por User.add_to_account,
+    # remove_from_account e update_role_in_account
+    member_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Só memberships com role admin/owner; o nº de admins exibido (AccountMembers,
+    # serializers) também conta o owner e super admins membros
+    admin_role_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     # Owner continua sendo um relacionamento direto (1 owner por account)
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -41,9 +86,49 @@ class Account(db.Model):
     # MÉTODOS DE USUÁRIOS (SAAS)
     # =============================================================================
     
+    def get_members(self, refresh=False):
+        """
+        Retorna os membros da account (AccountMembers) com seus roles.
+        O resultado fica em cache na instância até a próxima alteração de membership.
+        """
+        members = getattr(self, '_members_cache', None)
+        if members is None or refresh:
+            from .user import User
+            rows = db.session.query(User, user_accounts.c.role_in_account).join(
+                user_accounts, user_accounts.c.user_id == User.id
+            ).filter(
+                user_accounts.c.account_id == self.id
+            ).order_by(User.id).all()
+            members = self._members_cache = AccountMembers(self, rows)
+        return members
+    
+    def invalidate_members(self):
+        """Descarta o cache de membros (chamar após alterar user_accounts)"""
+        self._members_cache = None
+    
     def get_user_count(self):
-        """Retorna número de usuários na account"""
-        return self.users.count()
+        """Retorna número de usuários na account (contador desnormalizado)"""
+        return self.member_count or 0
+    
+    @staticmethod
+    def get_member_counts(account_ids):
+        """
+        Retorna dict account_id -> número de membros para várias accounts
+        em uma única query agrupada
+        """
+        account_ids = list(account_ids)
+        if not account_ids:
+            return {}
+        
+        rows = db.session.query(
+            user_accounts.c.account_id, db.func.count(user_accounts.c.user_id)
+        ).filter(
+            user_accounts.c.account_id.in_(account_ids)
+        ).group_by(user_accounts.c.account_id).all()
+        
+        counts = dict.fromkeys(account_ids, 0)
+        counts.update({account_id: count for account_id, count in rows})
+        return counts
     
     def get_users(self):
         """Retorna todos os usuários da account"""
@@ -60,13 +145,7 @@ class Account(db.Model):
     def get_admins(self):
         """Retorna usuários com role admin na account"""
         try:
-            # Versão simplificada usando o relacionamento many-to-many
-            admin_users = []
-            for user in self.users.all():
-                role = user.get_role_in_account(self)
-                if role in ['admin', 'owner'] or user.id == self.owner_id or user.is_super_admin():
-                    admin_users.append(user)
-            return admin_users
+            return self.get_members().admins
         except Exception as e:
             print(f"Erro em get_admins: {e}")
             return []
@@ -74,12 +153,7 @@ class Account(db.Model):
     def get_regular_users(self):
         """Retorna usuários com role user na account"""
         try:
-            regular_users = []
-            for user in self.users.all():
-                role = user.get_role_in_account(self)
-                if role == 'user' and user.id != self.owner_id and not user.is_super_admin():
-                    regular_users.append(user)
-            return regular_users
+            return self.get_members().regular_users
         except Exception as e:
             print(f"Erro em get_regular_users: {e}")
             return []
@@ -94,19 +168,12 @@ class Account(db.Model):
     
     def update_user_role(self, user, new_role):
         """Atualiza o role do usuário na account"""
-        if self.has_user(user):
-            try:
-                # Usar text() para queries SQL diretas
-                from sqlalchemy import text
-                db.session.execute(
-                    text("UPDATE user_accounts SET role_in_account = :new_role WHERE user_id = :user_id AND account_id = :account_id"),
-                    {'new_role': new_role, 'user_id': user.id, 'account_id': self.id}
-                )
-                return True
-            except Exception as e:
-                print(f"Erro ao atualizar role: {e}")
-                return False
-        return False
+        try:
+            # Delega para o User, que também mantém os contadores
+            return user.update_role_in_account(self, new_role)
+        except Exception as e:
+            print(f"Erro ao atualizar role: {e}")
+            return False
     
     # =============================================================================
     # MÉTODOS DE STATUS E VALIDAÇÃO
@@ -136,19 +203,9 @@ class Account(db.Model):
     # =============================================================================
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'subdomain': self.subdomain,
-            'status': self.status.value,
-            'is_active': self.is_active,
-            'owner_id': self.owner_id,
-            'owner_name': self.owner.get_full_name() if self.owner else None,
-            'user_count': self.get_user_count(),
-            'admin_count': len(self.get_admins()),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        """Converte account para dict (para listas use serialize_accounts)"""
+        from services.serializers import serialize_account
+        return serialize_account(self)
     
     def __repr__(self):
         return f'<Account {self.name} ({self.status.value})>'
\ No newline at end of file
@@ -0,0 +1,40 @@
+import sqlalchemy as sa
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+
+
+class RoutingSession(Session):
+    """
+    Session que manda leituras para uma réplica quando a view pediu
+    (g.db_replica, definido por services.replicas.read_replica).
+
+    Vão sempre para o primário: flush, INSERT/UPDATE/DELETE, SELECT ... FOR
+    UPDATE, SQL textual e tudo que vier depois da primeira escrita nesta
+    session (read-your-writes dentro do request).
+    """
+
+    def __init__(self, db, **kwargs):
+        super().__init__(db, **kwargs)
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None:
+            return primary
+
+        if self._flushing or isinstance(clause, sa.sql.dml.UpdateBase) or _locks_rows(clause):
+            self.wrote = True
+            return primary
+
+        if self.wrote or not getattr(clause, 'is_select', False) or not has_app_context():
+            return primary
+
+        replica = g.get('db_replica')
+        # Models com bind_key próprio continuam no bind deles
+        if replica is not None and primary is self._db.engines.get(None):
+            return replica
+        return primary
+
+
+def _locks_rows(clause):
+    return getattr(clause, '_for_update_arg', None) is not None
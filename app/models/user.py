@@ -1,10 +1,10 @@
 from flask_login import UserMixin
-from flask_bcrypt import generate_password_hash, check_password_hash
 from datetime import datetime
 from enum import Enum
 from flask import session
+from sqlalchemy.orm.attributes import set_committed_value
 from . import db
-from .user_account import user_accounts
+from .user_account import user_accounts, ADMIN_ROLES
 
 class UserRole(Enum):
     SUPER_ADMIN = "super_admin" 
@@ -13,6 +13,11 @@ class UserRole(Enum):
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Listagem do Super Admin: ordem (created_at, id) com e sem filtro de role
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+        db.Index('ix_users_role_created_at_id', 'role', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
@@ -29,6 +34,10 @@ class User(UserMixin, db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = db.Column(db.DateTime)
+    last_seen = db.Column(db.DateTime)
+    
+    # Contador desnormalizado de memberships (ver add_to_account)
+    account_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relacionamento Many-to-Many com accounts (ATUALIZADO)
     accounts = db.relationship('Account', 
@@ -49,12 +58,36 @@ class User(UserMixin, db.Model):
     # =============================================================================
     
     def set_password(self, password):
-        """Define a senha do usuário"""
-        self.password_hash = generate_password_hash(password).decode('utf-8')
+        """Define a senha do usuário (hash no pool do password_hasher)"""
+        from services.passwords import password_hasher
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
         """Verifica se a senha está correta"""
-        return check_password_hash(self.password_hash, password)
+        from services.passwords import password_hasher
+        return password_hasher.verify(self.password_hash, password)
+    
+    def rehash_password_if_needed(self, password):
+        """
+        Refaz o hash se ele foi gerado com custo menor que o atual.
+        Chamar apenas depois de check_password ter confirmado a senha.
+        """
+        from services.passwords import password_hasher
+        if password_hasher.needs_rehash(self.password_hash):
+            self.set_password(password)
+            return True
+        return False
+    
+    def update_last_login(self):
+        """
+        Registra o login. A gravação é feita em lote pelo timestamp_buffer
+        (write-behind), sem UPDATE/commit no request.
+        """
+        from services.write_behind import timestamp_buffer
+        now = datetime.utcnow()
+        # Reflete no objeto sem marcá-lo como alterado
+        set_committed_value(self, 'last_login', now)
+        timestamp_buffer.touch(self.id, 'last_login', now)
     
     def get_full_name(self):
         """Retorna nome completo"""
@@ -107,19 +140,43 @@ class User(UserMixin, db.Model):
         accessible_accounts = self.get_accessible_accounts()
         return accessible_accounts[0] if accessible_accounts else None
     
+    def get_accounts(self):
+        """Retorna as accounts ativas das quais o usuário é membro"""
+        return self.accounts.filter_by(is_active=True).all()
+    
+    def get_current_account(self):
+        """Retorna a account atual (da session ou a padrão)"""
+        return self.get_current_account_from_session()
+    
     def get_current_account_from_session(self):
-        """Retorna a account atual baseada na session"""
+        """
+        Retorna a account atual baseada na session. A revogação nas sessions
+        não cobre tudo (backend 'cookie', request concorrente regravando a
+        session, LRU de outro worker), então o acesso é conferido no
+        AccessContext memoizado do request.
+        """
         current_account_id = session.get('current_account_id')
-        if current_account_id and self.can_access_account(current_account_id):
-            from .account import Account
-            return Account.query.get(current_account_id)
+        if current_account_id:
+            from services.access import get_access_context
+            from services.sessions import clear_account_context
+            access = get_access_context(self)
+            if access is not None and access.can_access(current_account_id):
+                account = access.get_account(current_account_id)
+                if account is not None:
+                    return account
+            else:
+                clear_account_context()
         return self.get_default_account()
     
     def set_current_account(self, account_id):
         """Define a account atual na session"""
         if self.can_access_account(account_id):
-            session['current_account_id'] = account_id
-            return True
+            from .account import Account
+            from services.sessions import set_account_context
+            account = db.session.get(Account, account_id)
+            if account is not None:
+                set_account_context(account, self.get_role_in_account(account))
+                return True
         return False
     
     def get_role_in_account(self, account):
@@ -129,7 +186,7 @@ class User(UserMixin, db.Model):
         
         # Consultar role na tabela de associação
         result = db.session.execute(
-            db.select([user_accounts.c.role_in_account]).where(
+            db.select(user_accounts.c.role_in_account).where(
                 (user_accounts.c.user_id == self.id) & 
                 (user_accounts.c.account_id == account.id)
             )
@@ -155,7 +212,7 @@ class User(UserMixin, db.Model):
     
     def add_to_account(self, account, role_in_account='user'):
         """Adiciona usuário a uma account"""
-        if not self.is_in_account(account):
+        if self._get_membership_role(account) is None:
             # Usar SQL direto para inserir na tabela de associação
             db.session.execute(
                 user_accounts.insert().values(
@@ -164,18 +221,26 @@ class User(UserMixin, db.Model):
                     role_in_account=role_in_account
                 )
             )
+            self._update_membership_counters(
+                account, members=1, admins=int(role_in_account in ADMIN_ROLES)
+            )
             return True
         return False
     
     def remove_from_account(self, account):
         """Remove usuário de uma account"""
-        if self.is_in_account(account):
+        role = self._get_membership_role(account)
+        if role is not None:
             db.session.execute(
                 user_accounts.delete().where(
                     (user_accounts.c.user_id == self.id) & 
                     (user_accounts.c.account_id == account.id)
                 )
             )
+            self._update_membership_counters(
+                account, members=-1, admins=-int(role in ADMIN_ROLES)
+            )
+            self._revoke_account_context(account)
             return True
         return False
     
@@ -185,36 +250,61 @@ class User(UserMixin, db.Model):
     
     def update_role_in_account(self, account, new_role):
         """Atualiza o role do usuário em uma account"""
-        if self.is_in_account(account):
+        old_role = self._get_membership_role(account)
+        if old_role is not None:
             db.session.execute(
                 user_accounts.update().where(
                     (user_accounts.c.user_id == self.id) & 
                     (user_accounts.c.account_id == account.id)
                 ).values(role_in_account=new_role)
             )
+            self._update_membership_counters(
+                account, admins=int(new_role in ADMIN_ROLES) - int(old_role in ADMIN_ROLES)
+            )
+            self._revoke_account_context(account)
             return True
         return False
     
+    def _get_membership_role(self, account):
+        """Retorna o role bruto em user_accounts (None se não for membro)"""
+        return db.session.execute(
+            db.select(user_accounts.c.role_in_account).where(
+                (user_accounts.c.user_id == self.id) & 
+                (user_accounts.c.account_id == account.id)
+            )
+        ).scalar()
+    
+    def _revoke_account_context(self, account):
+        """Tira a account das sessions do usuário (revalidada no próximo acesso)"""
+        from services.sessions import revoke_account_context
+        revoke_account_context(self.id, account.id)
+    
+    def _update_membership_counters(self, account, members=0, admins=0):
+        """
+        Aplica o delta nos contadores desnormalizados. As expressões SQL
+        (coluna + delta) viram um UPDATE atômico, enviado no flush imediato
+        para que chamadas seguidas não sobrescrevam o delta pendente.
+        """
+        from .account import Account
+        
+        if members:
+            account.member_count = Account.member_count + members
+            self.account_count = User.account_count + members
+        if admins:
+            account.admin_role_count = Account.admin_role_count + admins
+        if members or admins:
+            db.session.flush()
+        
+        account.invalidate_members()
+    
     # =============================================================================
     # MÉTODOS DE SAÍDA E REPRESENTAÇÃO
     # =============================================================================
     
     def to_dict(self):
-        """Converte usuário para dict"""
-        return {
-            'id': self.id,
-            'email': self.email,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'full_name': self.get_full_name(),
-            'initials': self.get_initials(),
-            'role': self.role.value,
-            'theme_preference': self.theme_preference,
-            'account_count': self.accounts.count(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None
-        }
+        """Converte usuário para dict (para listas use serialize_users)"""
+        from services.serializers import serialize_user
+        return serialize_user(self)
     
     def __repr__(self):
         return f'<User {self.email} ({self.role.value})>'
\ No newline at end of file
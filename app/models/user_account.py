@@ -7,5 +7,45 @@ user_accounts = db.Table('user_accounts',
     db.Column('account_id', db.Integer, db.ForeignKey('accounts.id'), primary_key=True),
     db.Column('role_in_account', db.String(20), nullable=False, default='user'),  # admin, user
     db.Column('created_at', db.DateTime, default=datetime.utcnow),
-    db.Column('is_active', db.Boolean, default=True)
-)
\ No newline at end of file
+    db.Column('is_active', db.Boolean, default=True),
+    # A PK (user_id, account_id) só serve o lado do usuário; este índice cobre
+    # o lado da account (membros, admins por account) sem ler a tabela
+    db.Index('ix_user_accounts_account_role_user', 'account_id', 'role_in_account', 'user_id')
+)
+
+# Roles na tabela de associação que dão privilégio de administrador
+ADMIN_ROLES = ('admin', 'owner')
+
+def reconcile_membership_counters():
+    """
+    Recalcula os contadores desnormalizados (accounts.member_count,
+    accounts.admin_role_count e users.account_count) a partir de user_accounts.
+    Retorna quantas linhas estavam divergentes e foram corrigidas.
+    """
+    accounts = db.metadata.tables['accounts']
+    users = db.metadata.tables['users']
+    
+    member_count = db.select(db.func.count()).where(
+        user_accounts.c.account_id == accounts.c.id
+    ).scalar_subquery()
+    admin_role_count = db.select(db.func.count()).where(
+        (user_accounts.c.account_id == accounts.c.id) &
+        (user_accounts.c.role_in_account.in_(ADMIN_ROLES))
+    ).scalar_subquery()
+    account_count = db.select(db.func.count()).where(
+        user_accounts.c.user_id == users.c.id
+    ).scalar_subquery()
+    
+    fixed = db.session.execute(
+        accounts.update().where(
+            (accounts.c.member_count != member_count) |
+            (accounts.c.admin_role_count != admin_role_count)
+        ).values(member_count=member_count, admin_role_count=admin_role_count)
+    ).rowcount
+    fixed += db.session.execute(
+        users.update().where(
+            users.c.account_count != account_count
+        ).values(account_count=account_count)
+    ).rowcount
+    
+    return fixed
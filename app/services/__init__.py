@@ -0,0 +1,47 @@
+"""
+Serviços compartilhados da aplicação (cache, autorização, etc)
+"""
+
+from .access import AccessContext, get_access_context, invalidate_access_context
+from .user_cache import UserCache, user_cache
+from .stats import SystemStats, system_stats
+from .search import SearchIndex, search_index
+from .passwords import PasswordHasher, PasswordHasherBusy, password_hasher
+from .write_behind import TimestampBuffer, timestamp_buffer
+from .fragment_cache import FragmentCache, fragment_cache
+from .assets import AssetManifest, asset_manifest
+from .serializers import FastJSONProvider, serialize_users, serialize_accounts
+from .sqlite_tuning import SQLiteTuning, sqlite_tuning
+from .replicas import ReplicaRouter, replica_router, read_replica
+from .sql_profiler import SQLProfiler, sql_profiler
+
+__all__ = [
+    'AccessContext',
+    'get_access_context',
+    'invalidate_access_context',
+    'UserCache',
+    'user_cache',
+    'SystemStats',
+    'system_stats',
+    'SearchIndex',
+    'search_index',
+    'PasswordHasher',
+    'PasswordHasherBusy',
+    'password_hasher',
+    'TimestampBuffer',
+    'timestamp_buffer',
+    'FragmentCache',
+    'fragment_cache',
+    'AssetManifest',
+    'asset_manifest',
+    'FastJSONProvider',
+    'serialize_users',
+    'serialize_accounts',
+    'SQLiteTuning',
+    'sqlite_tuning',
+    'ReplicaRouter',
+    'replica_router',
+    'read_replica',
+    'SQLProfiler',
+    'sql_profiler'
+]
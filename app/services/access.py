@@ -0,0 +1,155 @@
+from flask import g, has_request_context
+from flask_login import current_user
+from models import db, user_accounts, Account, AccountStatus, ADMIN_ROLES
+
+
+class AccessContext:
+    """
+    Contexto de autorização do usuário, calculado uma única vez por request.
+
+    Guarda o flag de super admin, as memberships (account_id -> role) e as
+    accounts acessíveis. Decorators, context processors e filtros de template
+    devem consultar este objeto em vez dos métodos de User, que fazem uma
+    query a cada chamada.
+    """
+
+    def __init__(self, user):
+        self.user_id = user.id
+        self.is_super_admin = user.is_super_admin()
+        self._roles = None
+        self._member_accounts = None
+        self._accessible_accounts = None
+
+    # =============================================================================
+    # CARREGAMENTO (LAZY)
+    # =============================================================================
+
+    def _load_memberships(self):
+        """Carrega accounts e roles do usuário em uma única query"""
+        if self._roles is not None:
+            return
+
+        rows = db.session.query(Account, user_accounts.c.role_in_account).join(
+            user_accounts, user_accounts.c.account_id == Account.id
+        ).filter(
+            user_accounts.c.user_id == self.user_id
+        ).order_by(Account.id).all()
+
+        self._roles = {account.id: role for account, role in rows}
+        self._member_accounts = {account.id: account for account, _ in rows}
+
+    @property
+    def roles(self):
+        """Dict account_id -> role_in_account das memberships do usuário"""
+        self._load_memberships()
+        return self._roles
+
+    @property
+    def accessible_accounts(self):
+        """Lista de accounts que o usuário pode acessar"""
+        if self._accessible_accounts is None:
+            if self.is_super_admin:
+                # Super admin vê todas as accounts ativas
+                self._accessible_accounts = Account.query.filter(
+                    Account.status == AccountStatus.ACTIVE
+                ).all()
+            else:
+                self._load_memberships()
+                self._accessible_accounts = [
+                    account for account in self._member_accounts.values()
+                    if account.is_active
+                ]
+        return self._accessible_accounts
+
+    @property
+    def accessible_count(self):
+        """Número de accounts acessíveis (COUNT para super admin, sem carregar a lista)"""
+        if self._accessible_accounts is None and self.is_super_admin:
+            return Account.query.filter(Account.status == AccountStatus.ACTIVE).count()
+        return len(self.accessible_accounts)
+
+    # =============================================================================
+    # CONSULTAS
+    # =============================================================================
+
+    def get_account(self, account_id):
+        """Retorna a account pelo id, reaproveitando as já carregadas"""
+        if self._member_accounts and account_id in self._member_accounts:
+            return self._member_accounts[account_id]
+        if self._accessible_accounts is not None:
+            for account in self._accessible_accounts:
+                if account.id == account_id:
+                    return account
+        return Account.query.get(account_id)
+
+    def can_access(self, account_id):
+        """Verifica se o usuário pode acessar a account"""
+        if self.is_super_admin:
+            return True
+        try:
+            return int(account_id) in self.roles
+        except (TypeError, ValueError):
+            return False
+
+    def role_in(self, account):
+        """Retorna o role do usuário na account (ou None)"""
+        if self.is_super_admin:
+            return 'super_admin'
+        return self.roles.get(account.id)
+
+    def is_owner_of(self, account):
+        """Verifica se o usuário é owner da account"""
+        return account is not None and account.owner_id == self.user_id
+
+    def is_admin_of(self, account):
+        """Verifica se o usuário é administrador da account"""
+        if account is None:
+            return False
+        if self.is_super_admin:
+            return True
+        return self.role_in(account) in ADMIN_ROLES or self.is_owner_of(account)
+
+    def get_default_account(self):
+        """Retorna a primeira account acessível"""
+        accounts = self.accessible_accounts
+        return accounts[0] if accounts else None
+
+    def __repr__(self):
+        return f'<AccessContext user={self.user_id} super_admin={self.is_super_admin}>'
+
+
+# =============================================================================
+# ACESSO AO CONTEXTO DO REQUEST
+# =============================================================================
+
+def get_access_context(user=None):
+    """
+    Retorna o AccessContext do usuário no request atual (memoizado em g).
+    Fora de um request, constrói um contexto novo a cada chamada.
+    """
+    if user is None:
+        user = current_user
+    if not user or not user.is_authenticated:
+        return None
+
+    if not has_request_context():
+        return AccessContext(user)
+
+    contexts = g.setdefault('_access_contexts', {})
+    context = contexts.get(user.id)
+    if context is None:
+        context = contexts[user.id] = AccessContext(user)
+    return context
+
+
+def invalidate_access_context(user_id=None):
+    """Descarta o contexto memoizado (ex: após alterar memberships no request)"""
+    if not has_request_context():
+        return
+    contexts = g.get('_access_contexts')
+    if not contexts:
+        return
+    if user_id is None:
+        contexts.clear()
+    else:
+        contexts.pop(user_id, None)
@@ -0,0 +1,260 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import urllib.parse
+import urllib.request
+
+from flask import current_app, request, send_from_directory, url_for
+from werkzeug.security import safe_join
+from werkzeug.exceptions import NotFound
+
+# Dependência opcional: sem ela só os .gz são gerados
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Assets de terceiros copiados para static/vendor (versões fixas).
+# Enquanto não forem baixados pelo build, static_url aponta para a CDN.
+VENDOR_ASSETS = {
+    'vendor/boxicons/css/boxicons.min.css': 'https://unpkg.com/boxicons@2.1.4/css/boxicons.min.css',
+    'vendor/poppins/poppins.css': 'https://fonts.googleapis.com/css2?family=Poppins:wght@400;500;600;700&display=swap'
+}
+
+# User-Agent moderno: o Google Fonts só entrega woff2 para navegadores atuais
+VENDOR_USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.map', '.ttf', '.eot', '.otf', '.ico'}
+CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+class AssetManifest:
+    """
+    Resolve nomes lógicos de arquivos estáticos para as versões com hash
+    geradas por build() (static/dist + manifest.json) e serve esses arquivos
+    pré-comprimidos (br/gzip) com cache imutável de longo prazo.
+
+    Sem manifest (build não executado) tudo continua saindo de static/
+    como antes.
+    """
+
+    def __init__(self, app=None):
+        self.static_folder = None
+        self.max_age = 31536000
+        self._manifest = {}
+        self._mtime = None
+        self._auto_reload = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        self.max_age = app.config.get('STATIC_ASSETS_MAX_AGE', self.max_age)
+        self._auto_reload = app.debug
+        self._load()
+
+        app.extensions['asset_manifest'] = self
+        app.add_template_global(self.static_url, 'static_url')
+        # Substitui a view padrão de /static para servir os pré-comprimidos
+        app.view_functions['static'] = self.serve
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.static_folder, DIST_DIR, MANIFEST_NAME)
+
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.manifest_path)
+        except OSError:
+            self._manifest, self._mtime = {}, None
+            return
+        if mtime != self._mtime:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self._manifest = json.load(f)
+            self._mtime = mtime
+
+    # =============================================================================
+    # URLS
+    # =============================================================================
+
+    def static_url(self, filename):
+        """URL do arquivo estático (versão com hash, se houver build)"""
+        if self._auto_reload:
+            self._load()
+
+        hashed = self._manifest.get(filename)
+        if hashed:
+            return url_for('static', filename=f'{DIST_DIR}/{hashed}')
+        if filename in VENDOR_ASSETS and not os.path.exists(os.path.join(self.static_folder, filename)):
+            return VENDOR_ASSETS[filename]
+        return url_for('static', filename=filename)
+
+    # =============================================================================
+    # SERVIR
+    # =============================================================================
+
+    def serve(self, filename):
+        """View de /static: arquivos de dist/ vão pré-comprimidos e imutáveis"""
+        if not filename.startswith(DIST_DIR + '/'):
+            return current_app.send_static_file(filename)
+
+        path = safe_join(self.static_folder, filename)
+        if path is None or not os.path.isfile(path):
+            raise NotFound()
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        encoding = None
+        for name, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if request.accept_encodings[name] and os.path.isfile(path + suffix):
+                encoding, filename = name, filename + suffix
+                break
+
+        response = send_from_directory(self.static_folder, filename, mimetype=mimetype,
+                                       max_age=self.max_age)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+# =============================================================================
+# BUILD
+# =============================================================================
+
+def vendor(static_folder, log=print):
+    """Baixa os assets de terceiros (e as fontes referenciadas) para static/vendor"""
+    ok = True
+    for logical, source in VENDOR_ASSETS.items():
+        target = os.path.join(static_folder, logical)
+        try:
+            css = _download(source).decode('utf-8')
+            css = _vendor_css_urls(css, source, target)
+        except OSError as e:
+            log(f'⚠️ {logical}: não foi possível baixar {source} ({e})')
+            ok = False
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(css)
+        log(f'📦 {logical}')
+    return ok
+
+
+def _vendor_css_urls(css, source, target):
+    """Baixa os arquivos referenciados por url() e reescreve para caminhos locais"""
+    downloaded = {}
+
+    def replace(match):
+        quote, ref = match.group(1), match.group(2)
+        if ref.startswith('data:'):
+            return match.group(0)
+        absolute = urllib.parse.urljoin(source, ref)
+        parsed = urllib.parse.urlsplit(ref)
+        suffix = ('?' + parsed.query if parsed.query else '') + ('#' + parsed.fragment if parsed.fragment else '')
+
+        if parsed.scheme or ref.startswith('//'):
+            # Absoluta (ex: fonts.gstatic.com): guardar em fonts/ ao lado do CSS
+            local = 'fonts/' + os.path.basename(urllib.parse.urlsplit(absolute).path)
+        else:
+            local = parsed.path
+
+        path = os.path.normpath(os.path.join(os.path.dirname(target), local))
+        download_url = urllib.parse.urlunsplit(urllib.parse.urlsplit(absolute)._replace(query='', fragment=''))
+        if path not in downloaded:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(_download(download_url))
+            downloaded[path] = True
+        return f'url({quote}{local}{suffix}{quote})'
+
+    return CSS_URL.sub(replace, css)
+
+
+def _download(url):
+    req = urllib.request.Request(url, headers={'User-Agent': VENDOR_USER_AGENT})
+    with urllib.request.urlopen(req, timeout=30) as response:
+        return response.read()
+
+
+def build(static_folder, log=print):
+    """
+    Gera static/dist: cópias com hash do conteúdo no nome, CSS com url()
+    reescritas para os nomes com hash, irmãos .gz/.br e o manifest.json.
+    Retorna o manifest.
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+
+    sources = []
+    for root, dirs, files in os.walk(static_folder):
+        if os.path.abspath(root) == os.path.abspath(static_folder) and DIST_DIR in dirs:
+            dirs.remove(DIST_DIR)
+        for name in files:
+            sources.append(os.path.relpath(os.path.join(root, name), static_folder).replace(os.sep, '/'))
+
+    manifest = {}
+    # CSS por último: as url() precisam dos nomes com hash de fontes e imagens
+    for logical in sorted(sources, key=lambda p: (p.endswith('.css'), p)):
+        with open(os.path.join(static_folder, logical), 'rb') as f:
+            content = f.read()
+        if logical.endswith('.css'):
+            content = _rewrite_css(content.decode('utf-8'), logical, manifest).encode('utf-8')
+
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        base, ext = os.path.splitext(logical)
+        hashed = f'{base}.{digest}{ext}'
+        target = os.path.join(dist, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(content)
+        _compress(target, content, ext)
+        manifest[logical] = hashed
+
+    with open(os.path.join(dist, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    log(f'✅ {len(manifest)} arquivo(s) em {dist}' + ('' if brotli else ' (brotli não instalado: sem .br)'))
+    return manifest
+
+
+def _rewrite_css(css, logical, manifest):
+    directory = os.path.dirname(logical)
+
+    def replace(match):
+        quote, ref = match.group(1), match.group(2)
+        parsed = urllib.parse.urlsplit(ref)
+        if parsed.scheme or ref.startswith(('/', '//', 'data:')):
+            return match.group(0)
+        target = os.path.normpath(os.path.join(directory, parsed.path)).replace(os.sep, '/')
+        if target not in manifest:
+            return match.group(0)
+        relative = os.path.relpath(manifest[target], directory or '.').replace(os.sep, '/')
+        suffix = ('?' + parsed.query if parsed.query else '') + ('#' + parsed.fragment if parsed.fragment else '')
+        return f'url({quote}{relative}{suffix}{quote})'
+
+    return CSS_URL.sub(replace, css)
+
+
+def _compress(path, content, ext):
+    if ext not in COMPRESSIBLE:
+        return
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content, quality=11)))
+    for suffix, data in variants:
+        # Só vale a pena se ficar menor
+        if len(data) < len(content):
+            with open(path + suffix, 'wb') as f:
+                f.write(data)
+
+
+# Instância global
+asset_manifest = AssetManifest()
@@ -0,0 +1,140 @@
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, g, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import func
+from models import db, Account
+
+# Arquivos que mudam o HTML gerado (código, templates, manifest dos assets)
+RELEASE_FILES = ('.py', '.html', 'manifest.json')
+
+
+def init_conditional(app):
+    """
+    Sem ETAG_SALT/RELEASE no ambiente, o salt dos ETags é o hash do código e
+    dos templates: um deploy que muda o HTML invalida os ETags em aberto.
+    """
+    if not app.config.get('ETAG_SALT'):
+        app.config['ETAG_SALT'] = release_fingerprint(app.root_path)
+
+
+def release_fingerprint(root):
+    """Hash do conteúdo dos arquivos da aplicação (igual em todos os hosts)"""
+    digest = hashlib.sha1()
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if name != '__pycache__')
+        for filename in sorted(filenames):
+            if not filename.endswith(RELEASE_FILES):
+                continue
+            path = os.path.join(directory, filename)
+            digest.update(os.path.relpath(path, root).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha1(f.read()).digest())
+    return digest.hexdigest()[:12]
+
+
+def membership_version(*columns):
+    """
+    Versão global de accounts/memberships: (nº de accounts, maior updated_at).
+    Toda mudança de membership atualiza os contadores da account (e portanto
+    o updated_at), então este par muda junto. `columns` (scalar subqueries)
+    são buscadas na mesma query e anexadas ao resultado.
+    """
+    return tuple(db.session.execute(
+        db.select(func.count(Account.id), func.max(Account.updated_at), *columns)
+    ).one())
+
+
+def conditional(validator):
+    """
+    Decorator de GET condicional (ETag / Last-Modified) para páginas autenticadas.
+
+    `validator(**view_args)` retorna uma tupla com o que determina o conteúdo
+    da página (timestamps, ids, versões) ou None para renderizar sempre.
+    O ETag combina esses valores com o usuário atual e a account da session;
+    se o cliente já tem essa versão, responde 304 sem executar a view.
+    Last-Modified (e If-Modified-Since) só é usado quando a tupla tem apenas
+    timestamps: ids e contadores podem mudar sem avançar nenhuma data.
+    Usar abaixo dos decorators de autenticação/autorização.
+
+    Abaixo de @read_replica, o validador é calculado na réplica e no
+    primário: se diferirem (réplica atrasada), o request inteiro usa o
+    primário, para que o ETag nunca acompanhe um corpo desatualizado.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # Mensagens flash pendentes precisam ser renderizadas (e consumidas)
+            if request.method not in ('GET', 'HEAD') or '_flashes' in session:
+                return f(*args, **kwargs)
+
+            parts = _same_bind_validator(validator, kwargs)
+            if parts is None:
+                return f(*args, **kwargs)
+
+            etag, last_modified = _validators(parts)
+            if _not_modified(etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Conteúdo do usuário: o navegador pode guardar, mas revalida sempre
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.add('Cookie')
+            return response
+        return decorated_function
+    return decorator
+
+
+def _same_bind_validator(validator, kwargs):
+    """Valores do validador consistentes com o bind que vai renderizar a view"""
+    parts = validator(**kwargs)
+    replica = g.get('db_replica')
+    if parts is None or replica is None:
+        return parts
+
+    # Parte do validador vem do primário (g.current_account, AccessContext):
+    # só mantém a réplica se ela já enxerga as mesmas versões
+    g.db_replica = None
+    primary_parts = validator(**kwargs)
+    if primary_parts == parts:
+        g.db_replica = replica
+    return primary_parts
+
+
+def _validators(parts):
+    viewer = (current_user.get_id(), current_user.updated_at) if current_user.is_authenticated else None
+    key = repr((
+        current_app.config.get('ETAG_SALT', ''),
+        viewer,
+        session.get('current_account_id'),
+        parts
+    ))
+    etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    # Só datas: um contador ou id diferente não aparece em If-Modified-Since
+    if any(p is not None and not isinstance(p, datetime) for p in parts):
+        return etag, None
+    timestamps = [p for p in parts if p is not None]
+    if viewer and viewer[1]:
+        timestamps.append(viewer[1])
+    last_modified = max(timestamps).replace(tzinfo=timezone.utc, microsecond=0) if timestamps else None
+    return etag, last_modified
+
+
+def _not_modified(etag, last_modified):
+    # If-None-Match tem precedência sobre If-Modified-Since (RFC 9110)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified <= request.if_modified_since
+    return False
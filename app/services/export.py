@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+
+from flask import current_app, stream_with_context
+from sqlalchemy.orm import aliased
+from models import db, User, UserRole, Account, AccountStatus, user_accounts
+from services.search import search_index
+from services.serializers import orjson
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_DATASETS = ('users', 'accounts', 'memberships')
+
+MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# Início de célula que Excel/LibreOffice interpretam como fórmula
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def build_export_query(dataset, search='', role='', status='', account_id=None, user_id=None):
+    """
+    SELECT (Core, sem instâncias ORM) do dataset com os mesmos filtros das
+    listagens do Super Admin: users (search, role), accounts (search, status),
+    memberships (account_id, user_id, role). Ordenado pela chave primária.
+    Filtros com valor inválido são ignorados, como nas listagens.
+    """
+    if dataset == 'users':
+        query = db.select(
+            User.id, User.email, User.first_name, User.last_name, User.role,
+            User.theme_preference, User.account_count, User.created_at,
+            User.updated_at, User.last_login, User.last_seen
+        ).order_by(User.id)
+        if search:
+            query = search_index.filter_users(query, search)
+        if role:
+            try:
+                query = query.where(User.role == UserRole(role))
+            except ValueError:
+                pass
+        return query
+
+    if dataset == 'accounts':
+        owner = aliased(User)
+        query = db.select(
+            Account.id, Account.name, Account.subdomain, Account.status,
+            Account.is_active, Account.owner_id, owner.email.label('owner_email'),
+            Account.member_count, Account.admin_role_count, Account.created_at,
+            Account.updated_at
+        ).outerjoin(owner, owner.id == Account.owner_id).order_by(Account.id)
+        if search:
+            query = search_index.filter_accounts(query, search)
+        if status:
+            try:
+                query = query.where(Account.status == AccountStatus(status))
+            except ValueError:
+                pass
+        return query
+
+    if dataset == 'memberships':
+        query = db.select(
+            user_accounts.c.user_id, User.email.label('user_email'),
+            user_accounts.c.account_id, Account.name.label('account_name'),
+            user_accounts.c.role_in_account, user_accounts.c.is_active,
+            user_accounts.c.created_at
+        ).join(
+            User, User.id == user_accounts.c.user_id
+        ).join(
+            Account, Account.id == user_accounts.c.account_id
+        ).order_by(user_accounts.c.account_id, user_accounts.c.user_id)
+        if account_id:
+            query = query.where(user_accounts.c.account_id == account_id)
+        if user_id:
+            query = query.where(user_accounts.c.user_id == user_id)
+        if role:
+            query = query.where(user_accounts.c.role_in_account == role)
+        return query
+
+    raise ValueError(f'Dataset desconhecido: {dataset}')
+
+
+def stream_export(query, fmt='ndjson', batch_size=1000):
+    """
+    Gera o export em pedaços de bytes (um por lote de `batch_size` linhas).
+
+    A query roda com stream_results (cursor server-side no PostgreSQL) e
+    yield_per: só um lote fica em memória, qualquer que seja o tamanho da
+    tabela. Usar dentro de um app context (ou stream_with_context).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Formato desconhecido: {fmt}')
+
+    result = db.session.execute(
+        query.execution_options(stream_results=True, yield_per=batch_size)
+    )
+    columns = [str(column) for column in result.keys()]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+
+    if writer is not None:
+        writer.writerow(columns)
+        yield _drain(buffer)
+
+    for rows in result.partitions():
+        if writer is not None:
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield _drain(buffer)
+        else:
+            yield b''.join(
+                _dumps_line({column: _json_value(value) for column, value in zip(columns, row)})
+                for row in rows
+            )
+
+
+def export_response(dataset, fmt='ndjson', **filters):
+    """Resposta HTTP em streaming (download) do dataset filtrado"""
+    query = build_export_query(dataset, **filters)
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    response = current_app.response_class(
+        stream_with_context(stream_export(query, fmt, batch_size)),
+        mimetype=MIMETYPES[fmt]
+    )
+    filename = f'{dataset}-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}'
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Sem buffer no proxy (nginx): os lotes seguem para o cliente conforme saem
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _drain(buffer):
+    data = buffer.getvalue().encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def _dumps_line(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def _json_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    value = _json_value(value)
+    # Nomes e emails vêm dos usuários: neutraliza injeção de fórmulas na planilha
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
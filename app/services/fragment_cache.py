@@ -0,0 +1,166 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, has_request_context
+from jinja2 import nodes
+from jinja2.ext import Extension
+from sqlalchemy import event, inspect
+from models import db, Account
+from services.conditional import membership_version
+
+
+class FragmentCacheExtension(Extension):
+    """
+    Tag {% cache key, ttl %}...{% endcache %} para os templates.
+
+    O HTML renderizado do bloco é guardado no FragmentCache da aplicação
+    sob `key` (use fragment_key() para incluir usuário e versões). Sem ttl,
+    vale FRAGMENT_CACHE_TTL.
+    """
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        if parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_cache_support', args), [], [], body
+        ).set_lineno(lineno)
+
+    def _cache_support(self, key, ttl, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+
+        html = cache.get(key)
+        if html is None:
+            html = caller()
+            cache.set(key, html, ttl)
+        return html
+
+
+class FragmentCache:
+    """
+    Cache em processo (LRU + TTL) dos fragmentos de template.
+
+    As chaves geradas por fragment_key() incluem o usuário, o updated_at do
+    usuário (nome, role) e a versão global de memberships/accounts lida do
+    banco (membership_version, uma query por request). As duas versões vêm
+    de estado compartilhado: uma mudança em Account (nome, status,
+    contadores de membros, owner) ou no User feita em qualquer worker muda a
+    chave em todos, e as entradas antigas saem pelo LRU/TTL.
+    """
+
+    def __init__(self, app=None, maxsize=2048, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.maxsize = app.config.get('FRAGMENT_CACHE_SIZE', self.maxsize)
+        self.ttl = app.config.get('FRAGMENT_CACHE_TTL', self.ttl)
+        app.extensions['fragment_cache'] = self
+
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.fragment_cache = self
+        app.add_template_global(self.key, 'fragment_key')
+
+        for target in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(Account, target, self._mark_accounts_dirty)
+        event.listen(db.session, 'after_commit', self._after_commit)
+        event.listen(db.session, 'after_soft_rollback', self._after_rollback)
+
+    # =============================================================================
+    # CHAVES E VERSÕES
+    # =============================================================================
+
+    def key(self, name, *parts):
+        """Monta a chave do fragmento para o usuário atual"""
+        from flask_login import current_user
+        if current_user.is_authenticated:
+            user = (current_user.get_id(), current_user.updated_at)
+        else:
+            user = (None, None)
+        return (name,) + user + (self.membership_version(),) + parts
+
+    @staticmethod
+    def membership_version():
+        """Versão de accounts/memberships do banco, memoizada no request"""
+        if not has_request_context():
+            return membership_version()
+        if '_fragment_membership_version' not in g:
+            g._fragment_membership_version = membership_version()
+        return g._fragment_membership_version
+
+    @staticmethod
+    def bump_memberships():
+        """Relê a versão no próximo fragmento deste request (depois de um commit)"""
+        if has_request_context():
+            g.pop('_fragment_membership_version', None)
+
+    # =============================================================================
+    # LEITURA / ESCRITA
+    # =============================================================================
+
+    def get(self, key):
+        if self.maxsize <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, html = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return html
+
+    def set(self, key, html, ttl=None):
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, html)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # =============================================================================
+    # EVENTOS
+    # =============================================================================
+
+    @staticmethod
+    def _mark_accounts_dirty(mapper, connection, target):
+        session = inspect(target).session
+        if session is not None:
+            session.info['fragment_cache_accounts'] = True
+
+    def _after_commit(self, session):
+        if session.info.pop('fragment_cache_accounts', False):
+            self.bump_memberships()
+
+    @staticmethod
+    def _after_rollback(session, previous_transaction):
+        session.info.pop('fragment_cache_accounts', None)
+
+
+# Instância global
+fragment_cache = FragmentCache()
@@ -0,0 +1,326 @@
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+from models import db, User, UserRole, Account, user_accounts, ADMIN_ROLES
+
+BULK_ACTIONS = ('add', 'promote', 'demote', 'remove')
+ACCOUNT_ROLES = ('user', 'admin')
+
+
+class MembershipReport:
+    """Resultado por item (na ordem recebida) e totais por status"""
+
+    def __init__(self, items=()):
+        self.results = [item['result'] for item in items]
+
+    def summary(self):
+        totals = {}
+        for result in self.results:
+            totals[result['status']] = totals.get(result['status'], 0) + 1
+        return totals
+
+    def to_dict(self):
+        return {'summary': self.summary(), 'results': self.results}
+
+
+class BulkMemberships:
+    """
+    Adição, promoção, rebaixamento e remoção de membros de uma account em
+    lote, com as mesmas regras das rotas de um usuário por vez.
+
+    Os itens (ids ou emails) são resolvidos e validados em uma única query
+    (usuário + membership nesta account); as alterações viram statements
+    set-based (executemany / UPDATE ... WHERE id IN) em uma transação, com
+    os contadores desnormalizados ajustados por delta. Como o Core não
+    dispara os eventos do ORM, os caches (fragmentos, usuários, stats) são
+    marcados aqui e as sessions dos usuários afetados perdem o contexto da
+    account depois do commit.
+    """
+
+    def __init__(self, account, max_items=10000):
+        self.account = account
+        self.max_items = max_items
+
+    def run(self, action, items, default_role='user'):
+        """Aplica `action` nos itens e retorna o MembershipReport"""
+        if action not in BULK_ACTIONS:
+            raise ValueError(f'Ação inválida: {action}')
+        if len(items) > self.max_items:
+            raise ValueError(f'Máximo de {self.max_items} itens por requisição')
+
+        parsed = [self._parse(item, default_role) for item in items]
+        members = self._resolve(parsed)
+
+        seen = set()
+        valid = []
+        for item in parsed:
+            if 'result' in item:
+                continue
+            row = members.get(item['user_id']) or members.get(item['email'])
+            if row is None:
+                _mark(item, 'error', 'Usuário não encontrado')
+                continue
+            item['user_id'], item['email'], item['user_role'], item['membership'] = row
+            if item['user_id'] in seen:
+                _mark(item, 'error', 'Usuário repetido na requisição')
+                continue
+            seen.add(item['user_id'])
+            valid.append(item)
+
+        changes = getattr(self, f'_{action}')(valid)
+        if changes is not None:
+            db.session.commit()
+            self._after_commit(changes)
+        return MembershipReport(parsed)
+
+    # =============================================================================
+    # VALIDAÇÃO
+    # =============================================================================
+
+    @staticmethod
+    def _parse(item, default_role):
+        """Aceita id, email ou {'user_id'|'email', 'role'}"""
+        if isinstance(item, dict):
+            user_id, email, role = item.get('user_id'), item.get('email'), item.get('role') or default_role
+        elif isinstance(item, str) and not item.strip().isdigit():
+            user_id, email, role = None, item, default_role
+        else:
+            user_id, email, role = item, None, default_role
+
+        parsed = {'user_id': None, 'email': None, 'role': role}
+        try:
+            parsed['user_id'] = int(user_id) if user_id is not None else None
+        except (TypeError, ValueError):
+            return _mark(parsed, 'error', 'ID de usuário inválido')
+        if email is not None:
+            parsed['email'] = str(email).strip().lower()
+        if parsed['user_id'] is None and not parsed['email']:
+            _mark(parsed, 'error', 'Informe user_id ou email')
+        elif role not in ACCOUNT_ROLES:
+            _mark(parsed, 'error', f'Role inválido: {role}')
+        return parsed
+
+    def _resolve(self, parsed):
+        """
+        Uma query para todos os itens: id, email, role global e role nesta
+        account (None se não for membro), indexado por id e por email
+        """
+        pending = [item for item in parsed if 'result' not in item]
+        ids = {item['user_id'] for item in pending if item['user_id'] is not None}
+        emails = {item['email'] for item in pending if item['email']}
+        conditions = []
+        if ids:
+            conditions.append(User.id.in_(ids))
+        if emails:
+            conditions.append(User.email.in_(emails))
+        if not conditions:
+            return {}
+
+        rows = db.session.execute(
+            db.select(User.id, User.email, User.role, user_accounts.c.role_in_account).outerjoin(
+                user_accounts, and_(user_accounts.c.user_id == User.id,
+                                    user_accounts.c.account_id == self.account.id)
+            ).where(or_(*conditions))
+        ).all()
+        members = {}
+        for row in rows:
+            members[row.id] = members[row.email] = tuple(row)
+        return members
+
+    # =============================================================================
+    # AÇÕES
+    # =============================================================================
+
+    def _add(self, items):
+        now = datetime.utcnow()
+        new = []
+        for item in items:
+            if item['membership'] is not None:
+                _mark(item, 'unchanged', 'Usuário já está nesta account')
+            else:
+                new.append(item)
+                _mark(item, 'added')
+        if not new:
+            return None
+
+        db.session.execute(user_accounts.insert(), [{
+            'user_id': item['user_id'],
+            'account_id': self.account.id,
+            'role_in_account': item['role'],
+            'created_at': now,
+            'is_active': True
+        } for item in new])
+
+        user_ids = [item['user_id'] for item in new]
+        admins = [item for item in new if item['role'] in ADMIN_ROLES]
+        self._update_users(user_ids, account_count=User.account_count + 1)
+        # Admin da account vira administrador (super admin não muda)
+        promoted = self._set_global_role(admins, UserRole.ADMINISTRADOR, only_from=(UserRole.USER,))
+        self._update_counters(members=len(new), admins=len(admins))
+        return _Changes(user_ids, promoted, revoke=False)
+
+    def _promote(self, items):
+        targets = []
+        for item in items:
+            if item['membership'] is None:
+                _mark(item, 'error', 'Usuário não pertence a este account')
+            elif item['membership'] in ADMIN_ROLES:
+                _mark(item, 'unchanged')
+                targets.append(item)
+            else:
+                _mark(item, 'promoted')
+                targets.append(item)
+        promote = [item['user_id'] for item in targets if item['membership'] not in ADMIN_ROLES]
+        if promote:
+            self._set_membership_role(promote, 'admin')
+            self._update_counters(admins=len(promote))
+        promoted = self._set_global_role(targets, UserRole.ADMINISTRADOR, only_from=(UserRole.USER,))
+        if not promote and not promoted:
+            return None
+        return _Changes(promote, promoted)
+
+    def _demote(self, items):
+        demote = []
+        for item in items:
+            if item['membership'] is None:
+                _mark(item, 'error', 'Usuário não pertence a este account')
+            elif item['user_id'] == self.account.owner_id:
+                _mark(item, 'error', 'Não é possível rebaixar o owner do account')
+            elif item['membership'] not in ADMIN_ROLES:
+                _mark(item, 'unchanged')
+            else:
+                _mark(item, 'demoted')
+                demote.append(item['user_id'])
+        if not demote:
+            return None
+
+        self._set_membership_role(demote, 'user')
+        self._update_counters(admins=-len(demote))
+        # Continua administrador enquanto for admin/owner de alguma account
+        still_admin = db.select(user_accounts.c.user_id).where(
+            user_accounts.c.user_id == User.id, user_accounts.c.role_in_account.in_(ADMIN_ROLES)
+        ).exists()
+        owner = db.select(Account.id).where(Account.owner_id == User.id).exists()
+        demoted = self._drop_administrators(demote, ~still_admin, ~owner)
+        return _Changes(demote, demoted)
+
+    def _remove(self, items):
+        remove = []
+        admins = 0
+        for item in items:
+            if item['membership'] is None:
+                _mark(item, 'unchanged', 'Usuário não pertence a este account')
+            elif item['user_id'] == self.account.owner_id:
+                _mark(item, 'error', 'Não é possível remover o administrador do account')
+            else:
+                _mark(item, 'removed')
+                remove.append(item['user_id'])
+                admins += item['membership'] in ADMIN_ROLES
+        if not remove:
+            return None
+
+        for ids in _chunks(remove):
+            db.session.execute(user_accounts.delete().where(
+                user_accounts.c.account_id == self.account.id,
+                user_accounts.c.user_id.in_(ids)
+            ))
+        self._update_users(remove, account_count=User.account_count - 1)
+        self._update_counters(members=-len(remove), admins=-admins)
+        # Como remove_user: administrador sem nenhuma account volta a user
+        demoted = self._drop_administrators(remove, User.account_count == 0)
+        return _Changes(remove, demoted)
+
+    # =============================================================================
+    # STATEMENTS
+    # =============================================================================
+
+    def _set_membership_role(self, user_ids, role):
+        for ids in _chunks(user_ids):
+            db.session.execute(user_accounts.update().where(
+                user_accounts.c.account_id == self.account.id,
+                user_accounts.c.user_id.in_(ids)
+            ).values(role_in_account=role))
+
+    @staticmethod
+    def _update_users(user_ids, **values):
+        for ids in _chunks(user_ids):
+            db.session.execute(User.__table__.update().where(User.id.in_(ids)).values(**values))
+
+    @staticmethod
+    def _set_global_role(items, role, only_from):
+        """Atualiza o role global (lido na validação); retorna os ids alterados"""
+        changed = [item['user_id'] for item in items if item['user_role'] in only_from]
+        for ids in _chunks(changed):
+            db.session.execute(User.__table__.update().where(User.id.in_(ids)).values(role=role))
+        return changed
+
+    @staticmethod
+    def _drop_administrators(user_ids, *conditions):
+        """Administradores que atendem `conditions` voltam a user; retorna os ids"""
+        changed = []
+        for ids in _chunks(user_ids):
+            changed += db.session.execute(db.select(User.id).where(
+                User.id.in_(ids), User.role == UserRole.ADMINISTRADOR, *conditions
+            )).scalars().all()
+        for ids in _chunks(changed):
+            db.session.execute(User.__table__.update().where(User.id.in_(ids)).values(role=UserRole.USER))
+        return changed
+
+    def _update_counters(self, members=0, admins=0):
+        values = {}
+        if members:
+            values['member_count'] = Account.member_count + members
+        if admins:
+            values['admin_role_count'] = Account.admin_role_count + admins
+        if values:
+            db.session.execute(Account.__table__.update().where(Account.id == self.account.id).values(**values))
+
+    # =============================================================================
+    # CACHES E SESSIONS
+    # =============================================================================
+
+    def _after_commit(self, changes):
+        """Invalidações que os eventos do ORM fariam no caminho de um por vez"""
+        from services.access import invalidate_access_context
+        from services.fragment_cache import fragment_cache
+        from services.sessions import mark_user_changed, revoke_account_context
+        from services.stats import system_stats
+        from services.user_cache import user_cache
+
+        self.account.invalidate_members()
+        fragment_cache.bump_memberships()
+        for user_id in changes.roles_changed:
+            # Outros workers descartam o User em cache com o role antigo
+            mark_user_changed(user_id)
+        for user_id in set(changes.user_ids) | set(changes.roles_changed):
+            user_cache.invalidate(user_id)
+        if changes.roles_changed:
+            system_stats.invalidate()
+        invalidate_access_context()
+
+        if changes.revoke:
+            for user_id in changes.user_ids:
+                revoke_account_context(user_id, self.account.id)
+
+
+class _Changes:
+    """Usuários cuja membership mudou e os que mudaram de role global"""
+
+    def __init__(self, user_ids, roles_changed, revoke=True):
+        self.user_ids = user_ids
+        self.roles_changed = roles_changed
+        self.revoke = revoke
+
+
+def _mark(item, status, error=None):
+    """Resultado do item (id/email resolvidos, status e erro)"""
+    item['result'] = {'user_id': item.get('user_id'), 'email': item.get('email'), 'status': status}
+    if error:
+        item['result']['error'] = error
+    return item
+
+
+def _chunks(values, size=500):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
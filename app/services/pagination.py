@@ -0,0 +1,134 @@
+import base64
+import binascii
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at, item_id):
+    """Codifica a posição (created_at, id) em um token opaco para a URL"""
+    raw = f'{created_at.isoformat()}|{item_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decodifica o token do cursor; retorna None se for inválido"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, item_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+class KeysetPage:
+    """Página de resultados paginada por cursor (created_at DESC, id DESC)"""
+
+    def __init__(self, items, per_page, has_next, has_prev, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.total = total
+
+    @property
+    def next_cursor(self):
+        if not self.has_next or not self.items:
+            return None
+        last = self.items[-1]
+        return encode_cursor(last.created_at, last.id)
+
+    @property
+    def prev_cursor(self):
+        if not self.has_prev or not self.items:
+            return None
+        first = self.items[0]
+        return encode_cursor(first.created_at, first.id)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def keyset_paginate(query, model, after=None, before=None, per_page=20, count_ttl=0, count_key=None):
+    """
+    Pagina `query` pela chave (created_at, id) em ordem decrescente.
+
+    Em vez de OFFSET, cada página filtra a partir da última linha da anterior
+    (cursor `after`) ou da primeira da seguinte (`before`), então qualquer
+    página custa o mesmo que a primeira. O total é opcional: com count_ttl > 0
+    o COUNT é feito uma vez e reaproveitado por count_ttl segundos por count_key.
+    """
+    created_at, item_id = model.created_at, model.id
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    if before:
+        # Página anterior: percorre em ordem crescente e inverte o resultado
+        cursor_at, cursor_id = before
+        page_query = query.filter(or_(
+            created_at > cursor_at,
+            and_(created_at == cursor_at, item_id > cursor_id)
+        )).order_by(created_at.asc(), item_id.asc())
+    else:
+        page_query = query
+        if after:
+            cursor_at, cursor_id = after
+            page_query = page_query.filter(or_(
+                created_at < cursor_at,
+                and_(created_at == cursor_at, item_id < cursor_id)
+            ))
+        page_query = page_query.order_by(created_at.desc(), item_id.desc())
+
+    # Uma linha a mais indica se existe outra página na mesma direção
+    rows = page_query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if before:
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, after is not None
+
+    total = None
+    if count_ttl > 0:
+        total = count_cache.get_or_count(count_key or str(query), query, count_ttl)
+
+    return KeysetPage(rows, per_page, has_next, has_prev, total=total)
+
+
+class CountCache:
+    """Cache de COUNT(*) por chave (ex: filtros da listagem) com TTL"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_or_count(self, key, query, ttl):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        total = query.order_by(None).count()
+
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                self._entries.clear()
+            self._entries[key] = (now + ttl, total)
+        return total
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache()
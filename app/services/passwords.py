@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import bcrypt
+
+# Limite do bcrypt: bytes além do 72º são ignorados pelo algoritmo
+BCRYPT_MAX_BYTES = 72
+
+
+class PasswordHasherBusy(Exception):
+    """Fila de hashing cheia: a requisição deve ser recusada (503)"""
+
+
+class PasswordHasher:
+    """
+    Hashing de senhas bcrypt fora da thread do request.
+
+    Os hashes rodam em um pool de threads limitado (o bcrypt libera o GIL),
+    então no máximo `workers` hashes executam ao mesmo tempo por processo e
+    no máximo `max_queue` ficam aguardando; acima disso a chamada falha
+    rápido com PasswordHasherBusy em vez de prender todos os workers.
+
+    O custo (rounds) é calibrado na inicialização para ficar próximo de
+    PASSWORD_HASH_TARGET_MS, respeitando os limites mínimo e máximo.
+    Hashes com custo menor que o atual são refeitos no próximo login.
+    """
+
+    def __init__(self, app=None, rounds=12, workers=None, max_queue=64, timeout=10):
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS') or self.workers
+        self.max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE', self.max_queue)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+
+        rounds = app.config.get('PASSWORD_HASH_ROUNDS')
+        if rounds:
+            self.rounds = rounds
+        else:
+            self.rounds = self.calibrate(
+                target_ms=app.config.get('PASSWORD_HASH_TARGET_MS', 250),
+                min_rounds=app.config.get('PASSWORD_HASH_MIN_ROUNDS', 12),
+                max_rounds=app.config.get('PASSWORD_HASH_MAX_ROUNDS', 15)
+            )
+
+        # Mantém o Flask-Bcrypt coerente com o custo calibrado
+        app.config['BCRYPT_LOG_ROUNDS'] = self.rounds
+        app.extensions['password_hasher'] = self
+
+    # =============================================================================
+    # CALIBRAÇÃO
+    # =============================================================================
+
+    @staticmethod
+    def calibrate(target_ms=250, min_rounds=12, max_rounds=15, probe_rounds=8):
+        """
+        Retorna o maior custo cujo tempo estimado não passa de target_ms.
+        Mede um custo baixo e extrapola (cada round dobra o tempo).
+        """
+        salt = bcrypt.gensalt(probe_rounds)
+        elapsed = []
+        for _ in range(3):
+            start = time.perf_counter()
+            bcrypt.hashpw(b'calibracao', salt)
+            elapsed.append(time.perf_counter() - start)
+        probe_ms = min(elapsed) * 1000
+
+        rounds = probe_rounds
+        while rounds < max_rounds and probe_ms * 2 ** (rounds + 1 - probe_rounds) <= target_ms:
+            rounds += 1
+        return max(min_rounds, min(rounds, max_rounds))
+
+    # =============================================================================
+    # HASH / VERIFICAÇÃO
+    # =============================================================================
+
+    def hash(self, password):
+        """Gera o hash bcrypt (mesmo formato do Flask-Bcrypt)"""
+        return self._submit(_hash, _encode(password), self.rounds)
+
+    def verify(self, password_hash, password):
+        """Verifica a senha contra o hash armazenado"""
+        if not password_hash:
+            return False
+        return self._submit(_verify, password_hash.encode('utf-8'), _encode(password))
+
+    def hash_many(self, passwords):
+        """
+        Hashes de várias senhas em paralelo (importação em massa), na ordem.
+        Mantém no máximo `workers` hashes na fila por vez, deixando o resto
+        da fila para os logins; PasswordHasherBusy se não houver vaga a tempo.
+        """
+        executor = self._get_executor()
+        pending = deque()
+        hashes = []
+        try:
+            for password in passwords:
+                if len(pending) >= self.workers:
+                    hashes.append(self._result(pending.popleft()))
+                if not self._slots.acquire(timeout=self.timeout):
+                    raise PasswordHasherBusy('Fila de hashing de senhas cheia')
+                pending.append(self._enqueue(executor, _hash, _encode(password), self.rounds))
+            while pending:
+                hashes.append(self._result(pending.popleft()))
+        finally:
+            # Falhou no meio: o que ainda não começou sai da fila
+            for future in pending:
+                future.cancel()
+        return hashes
+
+    def needs_rehash(self, password_hash):
+        """Indica se o hash foi gerado com custo menor que o atual"""
+        try:
+            return int(password_hash.split('$')[2]) < self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+    def _submit(self, fn, *args):
+        executor = self._get_executor()
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Fila de hashing de senhas cheia')
+        return self._result(self._enqueue(executor, fn, *args))
+
+    def _enqueue(self, executor, fn, *args):
+        """Submete com a vaga já reservada; a vaga é liberada ao terminar"""
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _result(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Pool saturado: mesma resposta da fila cheia (503), não um 500
+            raise PasswordHasherBusy('Tempo de espera do hashing de senhas esgotado')
+
+    def _get_executor(self):
+        # Criado sob demanda: não sobrevive a fork, então cada worker cria o seu
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix='password-hasher'
+                    )
+                    self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+                    self._pid = os.getpid()
+        return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+def _encode(password):
+    return password.encode('utf-8')[:BCRYPT_MAX_BYTES]
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _verify(password_hash, password):
+    try:
+        return bcrypt.checkpw(password, password_hash)
+    except ValueError:
+        # Hash inválido/corrompido
+        return False
+
+
+# Instância global
+password_hasher = PasswordHasher()
@@ -0,0 +1,108 @@
+import random
+import sqlite3
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request, session
+from sqlalchemy import event
+from models import db
+
+# Chave na session do usuário: até quando as leituras ficam no primário
+STICKY_KEY = '_db_primary_until'
+
+
+class ReplicaRouter:
+    """
+    Roteamento de leituras para réplicas (binds em REPLICA_BINDS).
+
+    Views marcadas com @read_replica (GET/HEAD) leem de uma réplica
+    sorteada por request; a RoutingSession devolve escritas e tudo que
+    vem depois delas ao primário. Depois de um commit com escrita, a
+    session do usuário fica presa ao primário por REPLICA_STICKY_SECONDS
+    (o usuário vê o que acabou de gravar, mesmo com atraso na réplica).
+    Sem réplicas configuradas nada muda.
+    """
+
+    def __init__(self, app=None):
+        self.binds = []
+        self.sticky_seconds = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.binds = list(app.config.get('REPLICA_BINDS') or [])
+        self.sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', self.sticky_seconds)
+        missing = set(self.binds) - set(app.config.get('SQLALCHEMY_BINDS') or {})
+        if missing:
+            raise ValueError(f'REPLICA_BINDS sem URL em SQLALCHEMY_BINDS: {", ".join(sorted(missing))}')
+
+        app.extensions['replica_router'] = self
+        if self.binds:
+            event.listen(db.session, 'after_commit', self._after_commit)
+
+    @property
+    def enabled(self):
+        return bool(self.binds)
+
+    def choose(self):
+        """Engine de réplica para o request atual, ou None para usar o primário"""
+        if not self.binds or request.method not in ('GET', 'HEAD'):
+            return None
+        if session.get(STICKY_KEY, 0) > time.time():
+            return None
+        return db.engines[random.choice(self.binds)]
+
+    def _after_commit(self, db_session):
+        if getattr(db_session, 'wrote', False) and has_request_context():
+            session[STICKY_KEY] = time.time() + self.sticky_seconds
+
+    # =============================================================================
+    # SQLITE LOCAL
+    # =============================================================================
+
+    def sync_sqlite(self):
+        """
+        Copia o banco primário para as réplicas SQLite (backup online do
+        sqlite3), para testar o roteamento localmente com dois arquivos.
+        Retorna os binds copiados.
+        """
+        primary = db.engines[None]
+        if primary.dialect.name != 'sqlite':
+            return []
+
+        synced = []
+        for bind in self.binds:
+            replica = db.engines[bind]
+            if replica.dialect.name != 'sqlite' or not replica.url.database:
+                continue
+            replica.dispose()
+            source = sqlite3.connect(primary.url.database)
+            target = sqlite3.connect(replica.url.database)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            synced.append(bind)
+        return synced
+
+
+def read_replica(f):
+    """
+    Permite que as leituras da view saiam de uma réplica. Usar abaixo dos
+    decorators de autenticação/autorização (as checagens de acesso ficam
+    no primário).
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        router = current_app.extensions.get('replica_router')
+        g.db_replica = router.choose() if router is not None else None
+        try:
+            return f(*args, **kwargs)
+        finally:
+            g.db_replica = None
+    return decorated_function
+
+
+# Instância global
+replica_router = ReplicaRouter()
@@ -0,0 +1,183 @@
+from sqlalchemy import event, inspect, text
+from models import db, User, Account
+
+# Tamanho mínimo do termo para usar o índice de trigramas
+MIN_TRIGRAM_LENGTH = 3
+
+# =============================================================================
+# DDL DOS ÍNDICES (SQLITE FTS5 / POSTGRESQL PG_TRGM)
+# =============================================================================
+
+SQLITE_DDL = [
+    # Tabelas FTS5 com conteúdo externo (não duplicam os dados)
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        email, first_name, last_name,
+        content='users', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS accounts_fts USING fts5(
+        name, subdomain,
+        content='accounts', content_rowid='id', tokenize='trigram'
+    )""",
+
+    # Triggers mantêm os índices sincronizados com users/accounts
+    """CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, email, first_name, last_name)
+        VALUES (new.id, new.email, new.first_name, new.last_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, first_name, last_name)
+        VALUES ('delete', old.id, old.email, old.first_name, old.last_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF email, first_name, last_name ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, email, first_name, last_name)
+        VALUES ('delete', old.id, old.email, old.first_name, old.last_name);
+        INSERT INTO users_fts(rowid, email, first_name, last_name)
+        VALUES (new.id, new.email, new.first_name, new.last_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS accounts_fts_ai AFTER INSERT ON accounts BEGIN
+        INSERT INTO accounts_fts(rowid, name, subdomain)
+        VALUES (new.id, new.name, new.subdomain);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS accounts_fts_ad AFTER DELETE ON accounts BEGIN
+        INSERT INTO accounts_fts(accounts_fts, rowid, name, subdomain)
+        VALUES ('delete', old.id, old.name, old.subdomain);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS accounts_fts_au AFTER UPDATE OF name, subdomain ON accounts BEGIN
+        INSERT INTO accounts_fts(accounts_fts, rowid, name, subdomain)
+        VALUES ('delete', old.id, old.name, old.subdomain);
+        INSERT INTO accounts_fts(rowid, name, subdomain)
+        VALUES (new.id, new.name, new.subdomain);
+    END"""
+]
+
+SQLITE_REBUILD = [
+    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')",
+    "INSERT INTO accounts_fts(accounts_fts) VALUES ('rebuild')"
+]
+
+POSTGRESQL_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """CREATE INDEX IF NOT EXISTS ix_users_search_trgm ON users
+        USING gin ((email || ' ' || first_name || ' ' || last_name) gin_trgm_ops)""",
+    """CREATE INDEX IF NOT EXISTS ix_accounts_search_trgm ON accounts
+        USING gin ((name || ' ' || coalesce(subdomain, '')) gin_trgm_ops)"""
+]
+
+
+class SearchIndex:
+    """
+    Busca indexada de usuários e accounts para o painel Super Admin.
+
+    SQLite: tabelas FTS5 com tokenizer de trigramas (busca por substring e
+    prefixo), sincronizadas por triggers. PostgreSQL: índices GIN pg_trgm
+    sobre a concatenação das colunas, usados pelo ILIKE. Termos com menos de
+    3 caracteres, ou bancos sem o índice instalado, caem no LIKE original.
+    """
+
+    def __init__(self, app=None):
+        self._available = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['search_index'] = self
+        # db.create_all() também cria os índices (o Alembic usa a migração)
+        event.listen(db.metadata, 'after_create', self._after_create)
+
+    # =============================================================================
+    # INSTALAÇÃO E MANUTENÇÃO
+    # =============================================================================
+
+    def install(self, connection):
+        """Cria tabelas/índices/triggers de busca (idempotente)"""
+        dialect = connection.dialect.name
+        if dialect == 'sqlite':
+            statements = SQLITE_DDL
+        elif dialect == 'postgresql':
+            statements = POSTGRESQL_DDL
+        else:
+            return False
+
+        for statement in statements:
+            connection.execute(text(statement))
+        self._available.clear()
+        return True
+
+    def rebuild(self, connection):
+        """Reconstrói o conteúdo dos índices FTS5 a partir das tabelas"""
+        if connection.dialect.name != 'sqlite':
+            return False
+        for statement in SQLITE_REBUILD:
+            connection.execute(text(statement))
+        return True
+
+    def _after_create(self, target, connection, **kw):
+        if inspect(connection).has_table('users') and inspect(connection).has_table('accounts'):
+            self.install(connection)
+
+    def is_available(self):
+        """Verifica (uma vez por engine) se o índice está instalado"""
+        engine = db.engine
+        key = str(engine.url)
+        if key not in self._available:
+            with engine.connect() as connection:
+                if engine.dialect.name == 'sqlite':
+                    found = connection.execute(text(
+                        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"
+                    )).first()
+                elif engine.dialect.name == 'postgresql':
+                    found = connection.execute(text(
+                        "SELECT 1 FROM pg_indexes WHERE indexname = 'ix_users_search_trgm'"
+                    )).first()
+                else:
+                    found = None
+            self._available[key] = found is not None
+        return self._available[key]
+
+    # =============================================================================
+    # FILTROS DE BUSCA
+    # =============================================================================
+
+    def filter_users(self, query, term):
+        """Filtra a query de User por email, nome ou sobrenome"""
+        # Mesma expressão do índice ix_users_search_trgm (PostgreSQL)
+        document = User.email + ' ' + User.first_name + ' ' + User.last_name
+        return self._filter(query, term, User, 'users_fts', document,
+                            [User.email, User.first_name, User.last_name])
+
+    def filter_accounts(self, query, term):
+        """Filtra a query de Account por nome ou subdomínio"""
+        # Mesma expressão do índice ix_accounts_search_trgm (PostgreSQL)
+        document = Account.name + ' ' + db.func.coalesce(Account.subdomain, '')
+        return self._filter(query, term, Account, 'accounts_fts', document,
+                            [Account.name, Account.subdomain])
+
+    def _filter(self, query, term, model, fts_table, document, columns):
+        term = (term or '').strip()
+        if not term:
+            return query
+
+        if len(term) >= MIN_TRIGRAM_LENGTH and self.is_available():
+            dialect = db.engine.dialect.name
+            if dialect == 'sqlite':
+                # Frase entre aspas = substring exata no tokenizer de trigramas
+                phrase = '"' + term.replace('"', '""') + '"'
+                matches = text(
+                    f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH :fts_term"
+                ).bindparams(fts_term=phrase).columns(db.column('rowid'))
+                return query.filter(model.id.in_(matches))
+            if dialect == 'postgresql':
+                return query.filter(document.ilike(f'%{self._escape_like(term)}%', escape='\\'))
+
+        # Fallback: LIKE nas colunas (sem índice)
+        condition = columns[0].contains(term)
+        for column in columns[1:]:
+            condition = condition | column.contains(term)
+        return query.filter(condition)
+
+    @staticmethod
+    def _escape_like(term):
+        return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+search_index = SearchIndex()
@@ -0,0 +1,301 @@
+import random
+import time
+import unicodedata
+from array import array
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from models import db, User, UserRole, Account, AccountStatus, user_accounts, ADMIN_ROLES
+from services.search import search_index
+
+FIRST_NAMES = [
+    'Ana', 'Bruno', 'Camila', 'Diego', 'Eduarda', 'Felipe', 'Gabriela', 'Heitor', 'Isabela', 'João',
+    'Júlia', 'Lucas', 'Mariana', 'Matheus', 'Natália', 'Otávio', 'Paula', 'Rafael', 'Sofia', 'Thiago',
+    'Valentina', 'Vinícius', 'Beatriz', 'Carlos', 'Fernanda', 'Gustavo', 'Larissa', 'Pedro', 'Renata', 'Sérgio'
+]
+LAST_NAMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes',
+    'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes', 'Vieira', 'Barbosa',
+    'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes', 'Marques', 'Machado', 'Mendes', 'Freitas'
+]
+COMPANY_WORDS = [
+    'Turismo', 'Viagens', 'Expresso', 'Horizonte', 'Litoral', 'Serra', 'Rota', 'Destino', 'Aventura', 'Brasil',
+    'Atlântico', 'Cerrado', 'Pantanal', 'Sol', 'Mar', 'Vale', 'Trilhas', 'Caminhos', 'Estrela', 'Norte'
+]
+COMPANY_SUFFIXES = ['Ltda', 'Tur', 'Agência', 'Operadora', 'Receptivo', 'Eventos']
+
+# Distribuição do status das accounts (ativa / suspensa / inativa)
+STATUS_WEIGHTS = ((AccountStatus.ACTIVE, 90), (AccountStatus.SUSPENDED, 7), (AccountStatus.INACTIVE, 3))
+
+
+class SeedReport:
+    """Resultado do seed: quantidades inseridas e tempo de cada etapa"""
+
+    def __init__(self):
+        self.users = 0
+        self.accounts = 0
+        self.memberships = 0
+        self.timings = {}
+
+    def to_dict(self):
+        return {
+            'users': self.users,
+            'accounts': self.accounts,
+            'memberships': self.memberships,
+            'timings': self.timings
+        }
+
+
+class Seeder:
+    """
+    Gerador de dados sintéticos em escala (teste de carga).
+
+    Segue o que a aplicação produz: cada account tem um owner
+    ADMINISTRADOR com role 'admin' na account (accounts.create) e membros
+    'user', parte deles promovidos a 'admin' (add_user + promote), o que
+    também os torna ADMINISTRADOR no role global. O tamanho
+    das accounts segue uma distribuição exponencial em torno de
+    members_per_account (muitas pequenas, poucas grandes).
+
+    Os memberships são planejados antes, em arrays compactos, para que os
+    contadores desnormalizados já saiam corretos nos INSERTs. Tudo vai pelo
+    Core (executemany) em transações de batch_size linhas, com um único
+    hash bcrypt reaproveitado para todos os usuários.
+    """
+
+    def __init__(self, accounts=100, users=10000, members_per_account=10, super_admins=1,
+                 admin_ratio=0.1, password='senha123', password_hash=None,
+                 batch_size=50000, seed=None, email_domain='seed.local', days=730):
+        if users < super_admins + accounts:
+            raise ValueError('São necessários pelo menos super_admins + accounts usuários (um owner por account)')
+        self.n_accounts = accounts
+        self.n_users = users
+        self.members_per_account = members_per_account
+        self.super_admins = super_admins
+        self.admin_ratio = admin_ratio
+        self.password = password
+        self.password_hash = password_hash
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.email_domain = email_domain
+        self.days = days
+
+    def run(self, log=None):
+        """Insere usuários, accounts e memberships; retorna o SeedReport"""
+        log = log or (lambda message: None)
+        report = SeedReport()
+        engine = db.engine
+
+        if self.password_hash is None:
+            from services.passwords import password_hasher
+            self.password_hash = password_hasher.hash(self.password)
+
+        with engine.connect() as connection:
+            user_start = (connection.execute(db.select(db.func.max(User.id))).scalar() or 0) + 1
+            account_start = (connection.execute(db.select(db.func.max(Account.id))).scalar() or 0) + 1
+
+        started = time.perf_counter()
+        plan = self._plan()
+        report.timings['plan'] = round(time.perf_counter() - started, 2)
+        log(f'📐 {plan.memberships} memberships planejados em {report.timings["plan"]}s')
+
+        fts = engine.dialect.name == 'sqlite' and search_index.is_available()
+        if fts:
+            # Índice de busca reconstruído de uma vez no final (mais rápido que trigger por linha)
+            with engine.begin() as connection:
+                connection.execute(text('DROP TRIGGER IF EXISTS users_fts_ai'))
+                connection.execute(text('DROP TRIGGER IF EXISTS accounts_fts_ai'))
+
+        try:
+            for label, table, rows in (
+                ('users', User.__table__, self._user_rows(plan, user_start)),
+                ('accounts', Account.__table__, self._account_rows(plan, user_start, account_start)),
+                ('memberships', user_accounts, self._membership_rows(plan, user_start, account_start))
+            ):
+                started = time.perf_counter()
+                count = self._insert(engine, table, rows)
+                setattr(report, label, count)
+                report.timings[label] = round(time.perf_counter() - started, 2)
+                log(f'✅ {label}: {count} em {report.timings[label]}s')
+        finally:
+            if fts:
+                started = time.perf_counter()
+                with engine.begin() as connection:
+                    search_index.install(connection)
+                    search_index.rebuild(connection)
+                report.timings['search_index'] = round(time.perf_counter() - started, 2)
+                log(f'🔎 índice de busca reconstruído em {report.timings["search_index"]}s')
+
+        self._sync_sequences(engine)
+
+        # Inserts via Core não disparam os eventos do ORM
+        from services.stats import system_stats
+        system_stats.invalidate()
+        return report
+
+    # =============================================================================
+    # PLANEJAMENTO
+    # =============================================================================
+
+    def _plan(self):
+        """
+        Sorteia os membros de cada account. Índices relativos: usuários
+        0..super_admins-1 são super admins, os próximos n_accounts são os
+        owners (um por account) e o resto é o pool de membros.
+        """
+        rng = self.rng
+        pool_start = self.super_admins + self.n_accounts
+        pool_size = self.n_users - pool_start
+        plan = _Plan(self.n_users, self.n_accounts)
+
+        for account in range(self.n_accounts):
+            owner = self.super_admins + account
+            plan.add(account, owner, 'admin')
+
+            # Tamanho exponencial: média de members_per_account contando o owner
+            extra = self.members_per_account - 1
+            size = min(pool_size, int(rng.expovariate(1 / extra))) if extra > 0 else 0
+            for member in rng.sample(range(pool_size), size):
+                role = 'admin' if rng.random() < self.admin_ratio else 'user'
+                plan.add(account, pool_start + member, role)
+        return plan
+
+    # =============================================================================
+    # LINHAS
+    # =============================================================================
+
+    def _user_rows(self, plan, user_start):
+        rng = self.rng
+        now = datetime.utcnow()
+        span = timedelta(days=self.days).total_seconds()
+        emails = {}
+        for index in range(self.n_users):
+            first = FIRST_NAMES[rng.randrange(len(FIRST_NAMES))]
+            last = LAST_NAMES[rng.randrange(len(LAST_NAMES))]
+            user_id = user_start + index
+            if index < self.super_admins:
+                role = UserRole.SUPER_ADMIN
+            elif plan.user_admins[index]:
+                role = UserRole.ADMINISTRADOR  # owner ou admin de alguma account (promote)
+            else:
+                role = UserRole.USER
+            # Usuários mais novos têm ids maiores
+            created_at = now - timedelta(seconds=span * (1 - index / self.n_users) + rng.random() * 3600)
+            last_login = created_at + timedelta(seconds=rng.random() * (now - created_at).total_seconds()) \
+                if rng.random() < 0.7 else None
+            key = (first, last)
+            if key not in emails:
+                emails[key] = f'{_ascii(first)}.{_ascii(last)}'.lower()
+            yield {
+                'id': user_id,
+                'email': f'{emails[key]}.{user_id}@{self.email_domain}',
+                'password_hash': self.password_hash,
+                'first_name': first,
+                'last_name': last,
+                'theme_preference': 'dark' if rng.random() < 0.2 else 'light',
+                'role': role,
+                'account_count': plan.user_counts[index],
+                'created_at': created_at,
+                'updated_at': created_at,
+                'last_login': last_login,
+                'last_seen': last_login
+            }
+
+    def _account_rows(self, plan, user_start, account_start):
+        rng = self.rng
+        now = datetime.utcnow()
+        span = timedelta(days=self.days).total_seconds()
+        statuses = [status for status, _ in STATUS_WEIGHTS]
+        weights = [weight for _, weight in STATUS_WEIGHTS]
+        for index in range(self.n_accounts):
+            account_id = account_start + index
+            name = f'{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}'
+            status = rng.choices(statuses, weights)[0]
+            created_at = now - timedelta(seconds=span * (1 - index / self.n_accounts))
+            yield {
+                'id': account_id,
+                'name': name,
+                'subdomain': f'{_ascii(name.split()[0]).lower()}-{account_id}',
+                'status': status,
+                'is_active': status != AccountStatus.INACTIVE,
+                'member_count': plan.member_counts[index],
+                'admin_role_count': plan.admin_role_counts[index],
+                'owner_id': user_start + self.super_admins + index,
+                'created_by': user_start if self.super_admins else user_start + self.super_admins + index,
+                'created_at': created_at,
+                'updated_at': created_at
+            }
+
+    def _membership_rows(self, plan, user_start, account_start):
+        now = datetime.utcnow()
+        for account, user, admin in zip(plan.accounts, plan.users, plan.admins):
+            yield {
+                'account_id': account_start + account,
+                'user_id': user_start + user,
+                'role_in_account': 'admin' if admin else 'user',
+                'created_at': now,
+                'is_active': True
+            }
+
+    # =============================================================================
+    # GRAVAÇÃO
+    # =============================================================================
+
+    def _insert(self, engine, table, rows):
+        """executemany em transações de batch_size linhas"""
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                with engine.begin() as connection:
+                    connection.execute(table.insert(), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            with engine.begin() as connection:
+                connection.execute(table.insert(), batch)
+            count += len(batch)
+        return count
+
+    @staticmethod
+    def _sync_sequences(engine):
+        """Ids foram gravados explicitamente: acertar as sequences do PostgreSQL"""
+        if engine.dialect.name != 'postgresql':
+            return
+        with engine.begin() as connection:
+            for table in ('users', 'accounts'):
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+                ))
+
+
+class _Plan:
+    """Memberships planejados em arrays compactos (milhões de linhas cabem em poucos MB)"""
+
+    def __init__(self, n_users, n_accounts):
+        self.accounts = array('I')
+        self.users = array('I')
+        self.admins = bytearray()
+        self.user_counts = array('I', bytes(4 * n_users))
+        self.user_admins = bytearray(n_users)
+        self.member_counts = array('I', bytes(4 * n_accounts))
+        self.admin_role_counts = array('I', bytes(4 * n_accounts))
+
+    @property
+    def memberships(self):
+        return len(self.users)
+
+    def add(self, account, user, role):
+        self.accounts.append(account)
+        self.users.append(user)
+        is_admin = role in ADMIN_ROLES
+        self.admins.append(is_admin)
+        self.user_counts[user] += 1
+        self.user_admins[user] |= is_admin
+        self.member_counts[account] += 1
+        self.admin_role_counts[account] += is_admin
+
+
+def _ascii(value):
+    return unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode('ascii')
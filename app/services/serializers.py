@@ -0,0 +1,180 @@
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import inspect, or_
+from sqlalchemy.orm.util import identity_key
+from models import db, User, UserRole, Account, user_accounts, ADMIN_ROLES
+
+# Dependência opcional: sem ela o JSON sai pelo encoder padrão do Flask
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Limite de parâmetros por IN (SQLite antigo aceita no máximo 999)
+IN_CHUNK_SIZE = 500
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider do Flask usando orjson quando instalado.
+
+    Mantém o formato do provider padrão (datas em HTTP date, Decimal como
+    string, etc): tipos que o orjson não trata do mesmo jeito passam por
+    DefaultJSONProvider.default. Com indent (debug) usa o encoder padrão.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs.get('indent') or kwargs.get('cls'):
+            return super().dumps(obj, **kwargs)
+        return self._orjson_dumps(obj, kwargs.get('sort_keys', self.sort_keys)).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        # Bytes direto para a resposta, sem passar por str
+        return self._app.response_class(
+            self._orjson_dumps(obj, self.sort_keys) + b'\n', mimetype=self.mimetype
+        )
+
+    def _orjson_dumps(self, obj, sort_keys):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option)
+
+
+def init_json(app):
+    """Troca o JSON provider da aplicação (jsonify, request.get_json)"""
+    app.json = FastJSONProvider(app)
+
+
+# =============================================================================
+# SERIALIZAÇÃO EM LOTE
+# =============================================================================
+
+def serialize_users(users):
+    """
+    Lista de dicts dos usuários. Todos os campos são colunas (account_count
+    é desnormalizado); instâncias expiradas são recarregadas em uma query.
+    """
+    users = list(users)
+    _load_expired(User, users)
+    return [{
+        'id': user.id,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'full_name': user.get_full_name(),
+        'initials': user.get_initials(),
+        'role': user.role.value,
+        'theme_preference': user.theme_preference,
+        'account_count': user.account_count or 0,
+        'created_at': _isoformat(user.created_at),
+        'updated_at': _isoformat(user.updated_at),
+        'last_login': _isoformat(user.last_login),
+        'last_seen': _isoformat(user.last_seen)
+    } for user in users]
+
+
+def serialize_accounts(accounts):
+    """
+    Lista de dicts das accounts com owner e contagem de admins buscados
+    para o lote inteiro: no máximo 3 queries a cada IN_CHUNK_SIZE accounts
+    (recarga das expiradas, owners, admins), em vez de 3 por account.
+    """
+    accounts = list(accounts)
+    _load_expired(Account, accounts)
+    owners = _owner_names(accounts)
+    admin_counts = _admin_counts(accounts)
+    return [{
+        'id': account.id,
+        'name': account.name,
+        'subdomain': account.subdomain,
+        'status': account.status.value,
+        'is_active': account.is_active,
+        'owner_id': account.owner_id,
+        'owner_name': owners.get(account.owner_id),
+        'user_count': account.get_user_count(),
+        'admin_count': admin_counts.get(account.id, 0),
+        'created_at': _isoformat(account.created_at),
+        'updated_at': _isoformat(account.updated_at)
+    } for account in accounts]
+
+
+def serialize_user(user):
+    return serialize_users([user])[0]
+
+
+def serialize_account(account):
+    return serialize_accounts([account])[0]
+
+
+# =============================================================================
+# PREFETCH
+# =============================================================================
+
+def _chunks(values, size=IN_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _load_expired(model, objects):
+    """Recarrega em lote os atributos expirados (ex: depois de um commit)"""
+    # Id pela identity key: ler obj.id de uma instância expirada já dispararia a recarga
+    expired = [state.identity[0] for state in map(inspect, objects)
+               if state.identity and state.expired_attributes]
+    for ids in _chunks(expired):
+        # A identity map atualiza as instâncias existentes com as linhas lidas
+        db.session.query(model).filter(model.id.in_(ids)).all()
+
+
+def _owner_names(accounts):
+    """owner_id -> nome completo; owners já presentes na session não vão ao banco"""
+    names = {}
+    missing = set()
+    for owner_id in {account.owner_id for account in accounts}:
+        owner = db.session.identity_map.get(identity_key(User, owner_id))
+        if owner is not None and not inspect(owner).expired_attributes:
+            names[owner_id] = owner.get_full_name()
+        elif owner_id is not None:
+            missing.add(owner_id)
+
+    for ids in _chunks(missing):
+        rows = db.session.query(User.id, User.first_name, User.last_name).filter(User.id.in_(ids))
+        names.update({user_id: f'{first} {last}' for user_id, first, last in rows})
+    return names
+
+
+def _admin_counts(accounts):
+    """
+    account_id -> nº de admins, com a mesma regra de AccountMembers: role
+    admin/owner, o owner da account ou super admin membro
+    """
+    counts = {}
+    for ids in _chunks({account.id for account in accounts}):
+        rows = db.session.query(
+            user_accounts.c.account_id, db.func.count(user_accounts.c.user_id)
+        ).join(
+            User, User.id == user_accounts.c.user_id
+        ).join(
+            Account, Account.id == user_accounts.c.account_id
+        ).filter(
+            user_accounts.c.account_id.in_(ids),
+            or_(
+                user_accounts.c.role_in_account.in_(ADMIN_ROLES),
+                user_accounts.c.user_id == Account.owner_id,
+                User.role == UserRole.SUPER_ADMIN
+            )
+        ).group_by(user_accounts.c.account_id)
+        counts.update(dict(rows.all()))
+    return counts
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
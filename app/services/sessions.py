@@ -0,0 +1,478 @@
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import session
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class MemorySessionStore:
+    """Store chave-valor em memória (um processo só; desenvolvimento/testes)"""
+
+    def __init__(self):
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        with self._lock:
+            row = self._rows.get(sid)
+        if row is None or row[2] < time.time():
+            return None
+        return row[1], row[2]
+
+    def set(self, sid, user_id, payload, expires_at):
+        with self._lock:
+            self._rows[sid] = (user_id, payload, expires_at)
+
+    def delete(self, sid):
+        with self._lock:
+            self._rows.pop(sid, None)
+
+    def get_user_sessions(self, user_id):
+        with self._lock:
+            return [(sid, row[1], row[2]) for sid, row in self._rows.items() if row[0] == user_id]
+
+    def delete_user(self, user_id):
+        with self._lock:
+            sids = [sid for sid, row in self._rows.items() if row[0] == user_id]
+            for sid in sids:
+                del self._rows[sid]
+        return sids
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, row in self._rows.items() if row[2] < now]
+            for sid in expired:
+                del self._rows[sid]
+        return len(expired)
+
+
+class SQLiteSessionStore:
+    """
+    Store em um arquivo SQLite próprio (separado do banco da aplicação),
+    compartilhado entre os workers da máquina. Uma conexão por thread.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            sid TEXT PRIMARY KEY,
+            user_id INTEGER,
+            data TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_sessions_user_id ON sessions (user_id);
+        CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(self.SCHEMA)
+
+    def _connect(self):
+        # Conexões não sobrevivem a fork: reabrir no processo filho
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, sid):
+        return self._connect().execute(
+            'SELECT data, expires_at FROM sessions WHERE sid = ? AND expires_at >= ?', (sid, time.time())
+        ).fetchone()
+
+    def set(self, sid, user_id, payload, expires_at):
+        self._connect().execute(
+            'INSERT OR REPLACE INTO sessions (sid, user_id, data, expires_at) VALUES (?, ?, ?, ?)',
+            (sid, user_id, payload, expires_at)
+        )
+
+    def delete(self, sid):
+        self._connect().execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def get_user_sessions(self, user_id):
+        return self._connect().execute(
+            'SELECT sid, data, expires_at FROM sessions WHERE user_id = ?', (user_id,)
+        ).fetchall()
+
+    def delete_user(self, user_id):
+        connection = self._connect()
+        sids = [row[0] for row in connection.execute(
+            'SELECT sid FROM sessions WHERE user_id = ?', (user_id,)
+        )]
+        connection.execute('DELETE FROM sessions WHERE user_id = ?', (user_id,))
+        return sids
+
+    def purge_expired(self):
+        return self._connect().execute(
+            'DELETE FROM sessions WHERE expires_at < ?', (time.time(),)
+        ).rowcount
+
+
+# =============================================================================
+# SESSION INTERFACE
+# =============================================================================
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session cujo conteúdo fica no servidor; o cookie leva só o id assinado"""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+        self.rotate = False
+
+    # Leitura marca accessed (Vary: Cookie só quando a session foi usada)
+    def __getitem__(self, key):
+        self.accessed = True
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.accessed = True
+        return super().get(key, default)
+
+    def setdefault(self, key, default=None):
+        self.accessed = True
+        return super().setdefault(key, default)
+
+    def regenerate(self):
+        """Troca o id da session (chamar no login, contra session fixation)"""
+        self.rotate = True
+        self.modified = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Sessions server-side com backend plugável (SQLite ou memória), com um
+    LRU em processo na frente para evitar ler o store a cada request.
+
+    O LRU guarda o conteúdo por SESSION_LRU_TTL segundos; mudanças feitas
+    por outro worker (logout, revogação do contexto de account) aparecem
+    aqui depois desse intervalo. O store só é gravado quando a session muda
+    ou quando passou da metade da validade, e uma session que sumiu do store
+    (encerrada em outro worker) nunca é recriada por essa gravação.
+    """
+
+    serializer = TaggedJSONSerializer()
+    salt = 'server-side-session'
+    purge_every = 1000
+
+    def __init__(self, store, lru_size=4096, lru_ttl=5):
+        self.store = store
+        self.lru_size = lru_size
+        self.lru_ttl = lru_ttl
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def open_session(self, app, request):
+        sid = self._unsign(app, request.cookies.get(self.get_cookie_name(app)))
+        if sid is not None:
+            data = self._load(sid)
+            if data is not None:
+                return ServerSideSession(data, sid=sid)
+        return ServerSideSession(sid=self._new_sid(), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session:
+            if not session.new:
+                self._delete(session.sid)
+                if session.modified:
+                    self._delete_cookie(app, response)
+            return
+
+        if session.rotate:
+            self._delete(session.sid)
+            session.sid = self._new_sid()
+            session.new = True
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        expires_at = time.time() + lifetime
+        if session.modified or session.new or self._expiring(session.sid, lifetime):
+            if not self._save(session.sid, dict(session), expires_at, merge=not session.new):
+                # Revogada (logout, usuário desativado) enquanto vinha do LRU
+                self._delete_cookie(app, response)
+                return
+
+        if session.new or self.should_set_cookie(app, session):
+            response.set_cookie(
+                name,
+                self._sign(app, session.sid),
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app)
+            )
+
+    # =============================================================================
+    # REVOGAÇÃO (entre workers)
+    # =============================================================================
+
+    def delete_user_sessions(self, user_id):
+        """Encerra todas as sessions do usuário"""
+        for sid in self.store.delete_user(user_id):
+            self._forget(sid)
+
+    def update_user_sessions(self, user_id, update):
+        """Aplica update(dict) em todas as sessions do usuário"""
+        for sid, payload, expires_at in self.store.get_user_sessions(user_id):
+            data = self.serializer.loads(payload)
+            if update(data) is False:
+                continue
+            self.store.set(sid, user_id, self.serializer.dumps(data), expires_at)
+            self._forget(sid)
+
+    # =============================================================================
+    # INTERNOS
+    # =============================================================================
+
+    def _load(self, sid):
+        with self._lock:
+            entry = self._lru.get(sid)
+            if entry is not None:
+                if entry[0] >= time.monotonic():
+                    self._lru.move_to_end(sid)
+                    return dict(entry[2])
+                del self._lru[sid]
+
+        row = self.store.get(sid)
+        if row is None:
+            return None
+        data = self.serializer.loads(row[0])
+        self._remember(sid, data, row[1])
+        return dict(data)
+
+    def _save(self, sid, data, expires_at, merge=False):
+        """Grava a session; com merge, False (sem gravar) se ela não existe mais no store"""
+        if merge and not self._merge_stored(sid, data):
+            self._forget(sid)
+            return False
+        self.store.set(sid, _user_id(data), self.serializer.dumps(data), expires_at)
+        self._remember(sid, data, expires_at)
+
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            self.store.purge_expired()
+        return True
+
+    def _merge_stored(self, sid, data):
+        """
+        Session existente: False se foi apagada do store (revogada por outro
+        worker). Um request que começou antes de mark_user_changed regravaria
+        a session inteira sem a marca; a maior marca entre o store e o
+        request é preservada
+        """
+        row = self.store.get(sid)
+        if row is None:
+            return False
+        stored = self.serializer.loads(row[0]).get(USER_VERSION_KEY, 0)
+        if stored > data.get(USER_VERSION_KEY, 0):
+            data[USER_VERSION_KEY] = stored
+        return True
+
+    def _delete(self, sid):
+        self.store.delete(sid)
+        self._forget(sid)
+
+    def _expiring(self, sid, lifetime):
+        """Renovar a validade no store quando passou da metade"""
+        with self._lock:
+            entry = self._lru.get(sid)
+        if entry is None:
+            return False
+        return entry[1] - time.time() < lifetime / 2
+
+    def _remember(self, sid, data, expires_at):
+        if self.lru_size <= 0:
+            return
+        with self._lock:
+            self._lru[sid] = (time.monotonic() + self.lru_ttl, expires_at, dict(data))
+            self._lru.move_to_end(sid)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def _forget(self, sid):
+        with self._lock:
+            self._lru.pop(sid, None)
+
+    def _delete_cookie(self, app, response):
+        response.delete_cookie(self.get_cookie_name(app),
+                               domain=self.get_cookie_domain(app),
+                               path=self.get_cookie_path(app),
+                               secure=self.get_cookie_secure(app),
+                               samesite=self.get_cookie_samesite(app),
+                               httponly=self.get_cookie_httponly(app))
+
+    @staticmethod
+    def _new_sid():
+        return secrets.token_urlsafe(32)
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt=self.salt, key_derivation='hmac')
+
+    def _sign(self, app, sid):
+        return self._signer(app).sign(sid.encode('utf-8')).decode('utf-8')
+
+    def _unsign(self, app, value):
+        if not value:
+            return None
+        try:
+            return self._signer(app).unsign(value).decode('utf-8')
+        except BadSignature:
+            return None
+
+
+def _user_id(data):
+    # Chave usada pelo Flask-Login
+    try:
+        return int(data.get('_user_id'))
+    except (TypeError, ValueError):
+        return None
+
+
+# =============================================================================
+# INTEGRAÇÃO COM A APLICAÇÃO
+# =============================================================================
+
+def init_sessions(app):
+    """
+    Instala o backend de sessions configurado em SESSION_BACKEND:
+    'sqlite' (padrão), 'memory' ou 'cookie' (session assinada do Flask).
+    O store SQLite é um arquivo por host: em produção o backend é obrigatório.
+    """
+    backend = app.config.get('SESSION_BACKEND', 'sqlite')
+    if not backend:
+        raise ValueError('SESSION_BACKEND deve ser definido (sqlite, memory ou cookie)')
+    if backend == 'cookie':
+        return None
+
+    if backend == 'memory':
+        store = MemorySessionStore()
+    elif backend == 'sqlite':
+        path = app.config.get('SESSION_SQLITE_PATH') or os.path.join(app.instance_path, 'sessions.db')
+        store = SQLiteSessionStore(path)
+    else:
+        raise ValueError(f'SESSION_BACKEND inválido: {backend}')
+
+    app.session_interface = ServerSideSessionInterface(
+        store,
+        lru_size=app.config.get('SESSION_LRU_SIZE', 4096),
+        lru_ttl=app.config.get('SESSION_LRU_TTL', 5)
+    )
+    return app.session_interface
+
+
+def regenerate_session():
+    """Gera um novo id para a session atual (no-op com sessions em cookie)"""
+    if isinstance(session._get_current_object(), ServerSideSession):
+        session.regenerate()
+    # Session nova não aproveita o User em cache de antes do login
+    session[USER_VERSION_KEY] = time.time()
+
+
+# =============================================================================
+# CONTEXTO DE ACCOUNT NA SESSION
+# =============================================================================
+
+ACCOUNT_CONTEXT_KEYS = ('current_account_id', 'current_account_name', 'current_account_role')
+
+# Hora da última alteração de privilégios do usuário (validador do UserCache)
+USER_VERSION_KEY = '_user_version'
+
+
+def set_account_context(account, role):
+    """
+    Grava o contexto de account já validado (id, nome e role do usuário).
+    Só escreve quando muda, para não regravar a session a cada request.
+    """
+    if (session.get('current_account_id') != account.id
+            or session.get('current_account_name') != account.name
+            or session.get('current_account_role') != role):
+        session['current_account_id'] = account.id
+        session['current_account_name'] = account.name
+        session['current_account_role'] = role
+
+
+def clear_account_context():
+    for key in ACCOUNT_CONTEXT_KEYS:
+        session.pop(key, None)
+
+
+def _server_side_interface():
+    from flask import current_app
+    interface = current_app.session_interface
+    return interface if isinstance(interface, ServerSideSessionInterface) else None
+
+
+def revoke_account_context(user_id, account_id):
+    """
+    Remove o contexto da account das sessions do usuário em todos os workers
+    (ex: usuário removido da account ou role alterado)
+    """
+    interface = _server_side_interface()
+    if interface is None:
+        return
+
+    def update(data):
+        if data.get('current_account_id') != account_id:
+            return False
+        for key in ACCOUNT_CONTEXT_KEYS:
+            data.pop(key, None)
+
+    interface.update_user_sessions(user_id, update)
+
+
+
+def mark_user_changed(user_id):
+    """
+    Marca as sessions do usuário com a hora da alteração (ex: role): o
+    UserCache de qualquer worker descarta snapshots mais antigos que isso
+    """
+    interface = _server_side_interface()
+    if interface is None:
+        return
+    version = time.time()
+
+    def update(data):
+        data[USER_VERSION_KEY] = version
+
+    interface.update_user_sessions(user_id, update)
+
+
+def end_user_sessions(user_id):
+    """Encerra todas as sessions do usuário (ex: usuário excluído)"""
+    interface = _server_side_interface()
+    if interface is not None:
+        interface.delete_user_sessions(user_id)
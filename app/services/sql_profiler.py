@@ -0,0 +1,235 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import traceback
+from collections import deque
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# Normalização do SQL para agrupar execuções do mesmo statement
+_IN_LIST = re.compile(r'\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r'\s+')
+
+THIS_FILE = os.path.abspath(__file__)
+APP_ROOT = os.path.dirname(os.path.dirname(THIS_FILE))
+
+# Requests sem rota (404, varreduras) num único grupo: o resumo não cresce por path
+UNMATCHED_ENDPOINT = '<unmatched>'
+
+
+def fingerprint(statement):
+    """SQL sem literais e com listas IN colapsadas (chave de agrupamento)"""
+    statement = _IN_LIST.sub('(?)', statement)
+    statement = _LITERAL.sub('?', statement)
+    return _SPACES.sub(' ', statement).strip()
+
+
+class RequestProfile:
+    """Queries de um request: contagem, tempo e repetições por fingerprint"""
+
+    __slots__ = ('started', 'queries', 'db_time', 'statements', 'suspects')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = {}   # fingerprint -> [execuções, tempo]
+        self.suspects = {}     # fingerprint -> origem no código da aplicação
+
+    def record(self, statement, elapsed, threshold):
+        self.queries += 1
+        self.db_time += elapsed
+        key = fingerprint(statement)
+        entry = self.statements.setdefault(key, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        # Stack só uma vez, quando o statement atinge o limite de repetições
+        if entry[0] == threshold:
+            self.suspects[key] = _app_caller()
+
+    def n_plus_one(self):
+        return [
+            {'statement': key[:200], 'count': self.statements[key][0],
+             'ms': round(self.statements[key][1] * 1000, 2), 'origin': origin}
+            for key, origin in self.suspects.items()
+        ]
+
+
+class SQLProfiler:
+    """
+    Profiler de SQL por request (eventos before/after_cursor_execute de
+    todas as engines, inclusive réplicas).
+
+    Para cada request registra nº de queries, tempo total no banco e
+    statements repetidos; um mesmo statement executado
+    SQL_PROFILER_N_PLUS_ONE vezes ou mais é marcado como N+1, com a linha
+    do código da aplicação que o disparou. Os números saem no header
+    Server-Timing, em uma linha de log JSON e no resumo por endpoint
+    (/super-admin/sql-profile), com as últimas SQL_PROFILER_WINDOW
+    amostras de cada endpoint.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.threshold = 5
+        self.window = 200
+        self.headers = True
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('SQL_PROFILER_ENABLED', self.enabled)
+        self.threshold = app.config.get('SQL_PROFILER_N_PLUS_ONE', self.threshold)
+        self.window = app.config.get('SQL_PROFILER_WINDOW', self.window)
+        self.headers = app.config.get('SQL_PROFILER_HEADERS', self.headers)
+        app.extensions['sql_profiler'] = self
+        if not self.enabled:
+            return
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+                event.listen(engine, 'handle_error', self._handle_error)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    # =============================================================================
+    # EVENTOS
+    # =============================================================================
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('profiler_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['profiler_start'].pop()
+        # Threads de fundo (write-behind, etc) não pertencem a nenhum request
+        if has_request_context():
+            profile = g.get('sql_profile')
+            if profile is not None:
+                profile.record(statement, elapsed, self.threshold)
+
+    @staticmethod
+    def _handle_error(context):
+        # Query com erro não passa pelo after_cursor_execute
+        if context.connection is not None and context.connection.info.get('profiler_start'):
+            context.connection.info['profiler_start'].pop()
+
+    def _start_request(self):
+        if request.endpoint != 'static':
+            g.sql_profile = RequestProfile()
+
+    def _finish_request(self, response):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+
+        duration = time.perf_counter() - profile.started
+        suspects = profile.n_plus_one()
+        if self.headers:
+            response.headers.add(
+                'Server-Timing', f'db;dur={profile.db_time * 1000:.1f};desc="{profile.queries} queries"'
+            )
+            response.headers.add('Server-Timing', f'app;dur={duration * 1000:.1f}')
+
+        line = {
+            'method': request.method,
+            'endpoint': request.endpoint,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.queries,
+            'db_ms': round(profile.db_time * 1000, 2),
+            'duration_ms': round(duration * 1000, 2)
+        }
+        if suspects:
+            line['n_plus_one'] = suspects
+            logger.warning('sql_profile %s', json.dumps(line, ensure_ascii=False))
+        else:
+            logger.info('sql_profile %s', json.dumps(line, ensure_ascii=False))
+
+        self._add_sample(request.endpoint or UNMATCHED_ENDPOINT, profile, duration, suspects)
+        return response
+
+    # =============================================================================
+    # RESUMO POR ENDPOINT
+    # =============================================================================
+
+    def _add_sample(self, endpoint, profile, duration, suspects):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    'samples': deque(maxlen=self.window), 'requests': 0, 'n_plus_one': {}
+                }
+            stats['requests'] += 1
+            stats['samples'].append((profile.queries, profile.db_time * 1000, duration * 1000))
+            for suspect in suspects:
+                stats['n_plus_one'][suspect['origin'] or suspect['statement']] = suspect
+
+    def summary(self):
+        """Lista por endpoint (pior primeiro) com médias e p95 da janela"""
+        with self._lock:
+            snapshot = [(endpoint, stats['requests'], list(stats['samples']), list(stats['n_plus_one'].values()))
+                        for endpoint, stats in self._endpoints.items()]
+
+        rows = []
+        for endpoint, requests, samples, suspects in snapshot:
+            queries = sorted(s[0] for s in samples)
+            db_ms = sorted(s[1] for s in samples)
+            duration = sorted(s[2] for s in samples)
+            rows.append({
+                'endpoint': endpoint,
+                'requests': requests,
+                'samples': len(samples),
+                'avg_queries': sum(queries) / len(queries),
+                'p95_queries': _percentile(queries, 95),
+                'avg_db_ms': sum(db_ms) / len(db_ms),
+                'p95_db_ms': _percentile(db_ms, 95),
+                'p95_ms': _percentile(duration, 95),
+                'n_plus_one': suspects
+            })
+        rows.sort(key=lambda row: row['avg_db_ms'], reverse=True)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+def _percentile(values, pct):
+    """Percentil pelo método nearest-rank (values já ordenados)"""
+    if not values:
+        return 0
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def _app_caller(depth=2):
+    """
+    Origem da query no código da aplicação: o frame mais interno fora de
+    bibliotecas e quem o chamou (ex: o loop que chama get_role_in_account)
+    """
+    frames = []
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        filename = os.path.abspath(frame.filename)
+        if not filename.startswith(APP_ROOT) or 'site-packages' in filename or filename == THIS_FILE:
+            continue
+        frames.append(f'{os.path.relpath(filename, APP_ROOT)}:{frame.lineno} {frame.name}')
+        if len(frames) == depth:
+            break
+    return ' ← '.join(frames) or None
+
+
+# Instância global
+sql_profiler = SQLProfiler()
@@ -0,0 +1,100 @@
+import logging
+import time
+
+from sqlalchemy import event
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# Perfis de PRAGMAs aplicados a cada nova conexão SQLite (na ordem abaixo).
+# journal_mode=WAL é persistente no arquivo; os demais valem por conexão.
+SQLITE_PROFILES = {
+    # Comportamento padrão do SQLite (rollback journal, cache de ~2 MB)
+    'default': {},
+    'performance': {
+        # Leitores não bloqueiam o escritor (e vice-versa)
+        'journal_mode': 'WAL',
+        # Em WAL, NORMAL só perde as últimas transações em queda de energia (nunca corrompe)
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,           # ms esperando o lock de escrita antes de "database is locked"
+        'cache_size': -65536,           # negativo = KiB (64 MB por conexão)
+        'mmap_size': 268435456,         # 256 MB lidos via mmap, sem cópia para o cache
+        'temp_store': 'MEMORY',         # ORDER BY/GROUP BY temporários em memória
+        'analysis_limit': 1000          # limita o custo do PRAGMA optimize
+    }
+}
+
+
+class SQLiteTuning:
+    """
+    Aplica o perfil de PRAGMAs (SQLITE_PROFILE) às conexões SQLite do
+    Flask-SQLAlchemy no momento em que são abertas, e roda PRAGMA optimize
+    nas conexões do pool a cada SQLITE_OPTIMIZE_INTERVAL segundos.
+
+    SQLITE_PRAGMAS sobrescreve valores do perfil. Outros bancos são ignorados.
+    """
+
+    def __init__(self, app=None):
+        self.pragmas = {}
+        self.optimize_interval = 3600
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        profile = app.config.get('SQLITE_PROFILE', 'default')
+        if profile not in SQLITE_PROFILES:
+            raise ValueError(f'SQLITE_PROFILE desconhecido: {profile}')
+
+        self.pragmas = dict(SQLITE_PROFILES[profile])
+        self.pragmas.update(app.config.get('SQLITE_PRAGMAS') or {})
+        self.optimize_interval = app.config.get('SQLITE_OPTIMIZE_INTERVAL', self.optimize_interval)
+        app.extensions['sqlite_tuning'] = self
+
+        # Chamar depois de db.init_app (as engines já existem, sem conexões)
+        with app.app_context():
+            for engine in db.engines.values():
+                self.install(engine)
+
+    def install(self, engine):
+        """Registra os eventos na engine (só SQLite)"""
+        if engine.dialect.name != 'sqlite':
+            return False
+        if self.pragmas:
+            event.listen(engine, 'connect', self._on_connect)
+        if self.optimize_interval > 0:
+            event.listen(engine, 'checkout', self._on_checkout)
+        return True
+
+    # =============================================================================
+    # EVENTOS
+    # =============================================================================
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, self.pragmas)
+        connection_record.info['optimized_at'] = time.monotonic()
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        # Conexões ficam abertas no pool por horas: o optimize recomendado
+        # "antes de fechar" vira periódico
+        last = connection_record.info.setdefault('optimized_at', time.monotonic())
+        if time.monotonic() - last < self.optimize_interval:
+            return
+        connection_record.info['optimized_at'] = time.monotonic()
+        try:
+            dbapi_connection.execute('PRAGMA optimize')
+        except Exception as e:
+            logger.warning('PRAGMA optimize falhou: %s', e)
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """Executa os PRAGMAs em uma conexão sqlite3 recém-aberta"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+# Instância global
+sqlite_tuning = SQLiteTuning()
@@ -0,0 +1,120 @@
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from models import db, User, UserRole, Account, AccountStatus
+
+
+class SystemStats:
+    """
+    Snapshot das estatísticas globais do painel Super Admin.
+
+    Calculado em duas passadas (users GROUP BY role e accounts GROUP BY
+    status) e reaproveitado até expirar (SUPER_ADMIN_STATS_TTL). O recálculo
+    é single-flight: só um request por processo faz a varredura; os demais
+    recebem o snapshot anterior ou aguardam o primeiro cálculo. Uma
+    invalidação durante o cálculo (geração diferente) mantém o resultado
+    vencido, e a próxima leitura recalcula.
+    """
+
+    def __init__(self, app=None, ttl=30):
+        self.ttl = ttl
+        self._snapshot = None
+        self._computed_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._update_listeners = {attr: self._make_update_listener(attr) for attr in ('role', 'status')}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('SUPER_ADMIN_STATS_TTL', self.ttl)
+        app.extensions['system_stats'] = self
+
+        # Criar/remover users e accounts ou mudar role/status invalida o snapshot
+        # (uma vez só, mesmo com várias chamadas de create_app)
+        for model, attr in ((User, 'role'), (Account, 'status')):
+            _listen_once(model, 'after_insert', self._mark_dirty)
+            _listen_once(model, 'after_delete', self._mark_dirty)
+            _listen_once(model, 'after_update', self._update_listeners[attr])
+        _listen_once(db.session, 'after_commit', self._after_commit)
+
+    def get(self):
+        """Retorna o snapshot atual, recalculando se expirado"""
+        if self._snapshot is not None and not self._is_stale():
+            return self._snapshot
+
+        if self._snapshot is not None:
+            # Já existe snapshot: quem não conseguir o lock usa o anterior
+            if not self._lock.acquire(blocking=False):
+                return self._snapshot
+        else:
+            self._lock.acquire()
+
+        try:
+            # Outro request pode ter recalculado enquanto aguardávamos
+            if self._snapshot is None or self._is_stale():
+                generation = self._generation
+                started_at = time.monotonic()
+                self._snapshot = self._compute()
+                # Invalidado durante a varredura: o resultado pode ser anterior à mudança
+                self._computed_at = started_at if generation == self._generation else 0.0
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        """Força o recálculo na próxima leitura"""
+        self._generation += 1
+        self._computed_at = 0.0
+
+    @staticmethod
+    def _mark_dirty(mapper, connection, target):
+        session = inspect(target).session
+        if session is not None:
+            session.info['system_stats_dirty'] = True
+
+    def _make_update_listener(self, attr):
+        def listener(mapper, connection, target):
+            if inspect(target).attrs[attr].history.has_changes():
+                self._mark_dirty(mapper, connection, target)
+        return listener
+
+    def _after_commit(self, session):
+        if session.info.pop('system_stats_dirty', False):
+            self.invalidate()
+
+    def _is_stale(self):
+        return time.monotonic() - self._computed_at >= self.ttl
+
+    @staticmethod
+    def _compute():
+        users_by_role = dict(
+            db.session.query(User.role, db.func.count(User.id)).group_by(User.role).all()
+        )
+        accounts_by_status = dict(
+            db.session.query(Account.status, db.func.count(Account.id)).group_by(Account.status).all()
+        )
+
+        total_users = sum(users_by_role.values())
+        super_admins = users_by_role.get(UserRole.SUPER_ADMIN, 0)
+        admins = users_by_role.get(UserRole.ADMINISTRADOR, 0)
+
+        return {
+            'total_users': total_users,
+            'total_accounts': sum(accounts_by_status.values()),
+            'super_admins': super_admins,
+            'admins': admins,
+            'regular_users': total_users - super_admins - admins,
+            'active_accounts': accounts_by_status.get(AccountStatus.ACTIVE, 0),
+            'suspended_accounts': accounts_by_status.get(AccountStatus.SUSPENDED, 0),
+            'inactive_accounts': accounts_by_status.get(AccountStatus.INACTIVE, 0)
+        }
+
+
+def _listen_once(target, identifier, fn):
+    if not event.contains(target, identifier, fn):
+        event.listen(target, identifier, fn)
+
+
+system_stats = SystemStats()
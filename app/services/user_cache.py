@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import has_request_context, session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from models import db, User
+
+
+class UserCache:
+    """
+    Cache de identidade para o user_loader do Flask-Login.
+
+    LRU limitado com TTL que guarda um snapshot desanexado (detached) de cada
+    User. A cada request o snapshot é anexado à session com merge(load=False),
+    sem nenhum SELECT; o objeto em cache nunca é alterado.
+
+    O cache é por processo: alterações em User invalidam a entrada no commit
+    deste worker. Mudanças de role também marcam as sessions server-side do
+    usuário (mark_user_changed) e, em qualquer worker, um snapshot mais
+    antigo que a marca da session é descartado. Com sessions em cookie não
+    há onde propagar a marca, então o cache fica desligado.
+    """
+
+    def __init__(self, app=None, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.maxsize = app.config.get('USER_CACHE_SIZE', self.maxsize)
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        if app.config.get('SESSION_BACKEND', 'sqlite') == 'cookie':
+            self.maxsize = 0
+        app.extensions['user_cache'] = self
+
+        # Invalidar quando User for alterado/removido (efetivado no commit)
+        event.listen(User, 'after_update', self._mark_dirty)
+        event.listen(User, 'after_update', self._mark_role_changed)
+        event.listen(User, 'after_delete', self._mark_dirty)
+        event.listen(db.session, 'after_commit', self._after_commit)
+        event.listen(db.session, 'after_soft_rollback', self._after_rollback)
+
+    # =============================================================================
+    # LEITURA
+    # =============================================================================
+
+    def get(self, user_id):
+        """Retorna o User anexado à session atual (do cache ou do banco)"""
+        snapshot = self._get_snapshot(user_id)
+        if snapshot is not None:
+            self.hits += 1
+            return db.session.merge(snapshot, load=False)
+
+        self.misses += 1
+        user = db.session.get(User, user_id)
+        if user is not None:
+            self._put(user_id, self._snapshot(user))
+        return user
+
+    def _get_snapshot(self, user_id):
+        if self.maxsize <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, cached_at, snapshot = entry
+            if expires_at < time.monotonic() or cached_at < _session_version():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return snapshot
+
+    def _put(self, user_id, snapshot):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, time.time(), snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _snapshot(user):
+        """Copia as colunas do User para uma instância desanexada (read-only)"""
+        mapper = inspect(User)
+        snapshot = mapper.class_manager.new_instance()
+        for attr in mapper.column_attrs:
+            set_committed_value(snapshot, attr.key, getattr(user, attr.key))
+        make_transient_to_detached(snapshot)
+        return snapshot
+
+    # =============================================================================
+    # INVALIDAÇÃO
+    # =============================================================================
+
+    def invalidate(self, user_id):
+        """Remove o usuário do cache"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        """Esvazia o cache"""
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _mark_dirty(mapper, connection, target):
+        session = inspect(target).session
+        if session is not None:
+            session.info.setdefault('user_cache_dirty', set()).add(target.id)
+
+    @staticmethod
+    def _mark_role_changed(mapper, connection, target):
+        state = inspect(target)
+        if state.session is not None and state.attrs.role.history.has_changes():
+            state.session.info.setdefault('user_cache_roles', set()).add(target.id)
+
+    def _after_commit(self, db_session):
+        for user_id in db_session.info.pop('user_cache_dirty', ()):
+            self.invalidate(user_id)
+        roles_changed = db_session.info.pop('user_cache_roles', ())
+        if roles_changed and has_request_context():
+            from services.sessions import mark_user_changed
+            for user_id in roles_changed:
+                mark_user_changed(user_id)
+
+    @staticmethod
+    def _after_rollback(db_session, previous_transaction):
+        db_session.info.pop('user_cache_dirty', None)
+        db_session.info.pop('user_cache_roles', None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _session_version():
+    """Marca de alteração gravada na session do request (0 fora de request)"""
+    if not has_request_context():
+        return 0
+    from services.sessions import USER_VERSION_KEY
+    return session.get(USER_VERSION_KEY, 0)
+
+
+user_cache = UserCache()
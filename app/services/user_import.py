@@ -0,0 +1,272 @@
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+import bcrypt
+from models import db, User, UserRole, Account, user_accounts, ADMIN_ROLES
+from services.passwords import PasswordHasherBusy
+
+# Super admins só são criados um a um (super_admin.users.create)
+ROLE_MAP = {
+    'administrador': UserRole.ADMINISTRADOR,
+    'user': UserRole.USER
+}
+
+
+def hash_password(password, rounds=12):
+    """Gera o hash bcrypt no mesmo formato do Flask-Bcrypt (roda nos workers)"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def iter_rows(stream, fmt='csv'):
+    """
+    Lê o arquivo linha a linha (sem carregar tudo em memória).
+    Gera (número da linha, dict) para CSV com cabeçalho ou JSONL.
+    """
+    if isinstance(stream, (bytes, bytearray)):
+        stream = io.BytesIO(stream)
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'jsonl':
+        for line_no, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                yield line_no, ValueError(f'JSON inválido: {e}')
+                continue
+            yield line_no, data if isinstance(data, dict) else ValueError('Linha JSON deve ser um objeto')
+    else:
+        reader = csv.DictReader(stream)
+        for data in reader:
+            # line_num aponta para a última linha física lida (cabeçalho = 1)
+            yield reader.line_num, data
+
+
+class ImportReport:
+    """Resultado da importação: contadores e erros por linha"""
+
+    def __init__(self, max_errors=1000):
+        self.created = 0
+        self.skipped = 0
+        self.attached = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_error(self, line_no, email, message):
+        """Registra a falha (a lista de detalhes é limitada a max_errors)"""
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line_no, 'email': email, 'error': message})
+
+    def to_dict(self):
+        return {
+            'created': self.created,
+            'skipped': self.skipped,
+            'attached': self.attached,
+            'failed': self.failed,
+            'errors': self.errors
+        }
+
+
+class UserImporter:
+    """
+    Importação em massa de usuários.
+
+    Processa o arquivo em lotes: valida as linhas, descarta emails já
+    existentes (uma query por lote), gera os hashes bcrypt e insere com
+    executemany em uma transação por lote. Opcionalmente associa os novos
+    usuários a uma account com um role.
+
+    Com workers > 1 (CLI) os hashes rodam em paralelo num pool de
+    processos; com `hasher` (upload) cada lote vai inteiro para o pool de
+    threads do password_hasher (hash_many), usando todos os núcleos sem
+    criar processos no request. Fila cheia falha só o lote, no relatório.
+    """
+
+    def __init__(self, batch_size=1000, workers=1, rounds=12, hasher=None,
+                 account=None, role_in_account='user', max_errors=1000):
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.rounds = rounds
+        self.hasher = hasher
+        self.account = account
+        self.role_in_account = role_in_account
+        self.max_errors = max_errors
+
+    def run(self, rows):
+        """Importa as linhas de iter_rows() e retorna o ImportReport"""
+        report = ImportReport(max_errors=self.max_errors)
+        rows = iter(rows)
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self._import_batch(batch, report, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Inserts via Core não disparam os eventos do ORM
+        from services.stats import system_stats
+        system_stats.invalidate()
+
+        return report
+
+    # =============================================================================
+    # LOTES
+    # =============================================================================
+
+    def _import_batch(self, batch, report, executor):
+        candidates = self._validate(batch, report)
+        if not candidates:
+            return
+
+        # Deduplicar contra o banco em uma única query
+        emails = [row['email'] for row in candidates]
+        existing = set(db.session.execute(
+            db.select(User.email).where(User.email.in_(emails))
+        ).scalars())
+        new_rows = []
+        for row in candidates:
+            if row['email'] in existing:
+                report.skipped += 1
+            else:
+                new_rows.append(row)
+        if not new_rows:
+            return
+
+        passwords = [row.pop('password') for row in new_rows]
+        try:
+            hashes = self._hash_passwords(passwords, executor)
+        except PasswordHasherBusy as e:
+            # Lotes anteriores já foram gravados: registra e segue para o próximo
+            for row in new_rows:
+                report.add_error(row['line'], row['email'], f'Hashing indisponível: {e}')
+            return
+
+        now = datetime.utcnow()
+        attach = self.account is not None
+        promote = attach and self.role_in_account == 'admin'
+        params = []
+        for row, password_hash in zip(new_rows, hashes):
+            # Mesmo comportamento de accounts.add_user: admin da account vira administrador
+            role = row['role']
+            if promote and role == UserRole.USER:
+                role = UserRole.ADMINISTRADOR
+            params.append({
+                'email': row['email'],
+                'password_hash': password_hash,
+                'first_name': row['first_name'],
+                'last_name': row['last_name'],
+                'role': role,
+                'theme_preference': 'light',
+                'account_count': 1 if attach else 0,
+                'created_at': now,
+                'updated_at': now
+            })
+
+        try:
+            db.session.execute(User.__table__.insert(), params)
+            if attach:
+                self._attach(new_rows, now)
+            db.session.commit()
+            report.created += len(new_rows)
+            if attach:
+                report.attached += len(new_rows)
+        except Exception as e:
+            db.session.rollback()
+            for row in new_rows:
+                report.add_error(row['line'], row['email'], f'Erro ao inserir lote: {e}')
+
+    def _hash_passwords(self, passwords, executor):
+        if executor is not None:
+            chunksize = max(1, len(passwords) // (self.workers * 4))
+            return list(executor.map(hash_password, passwords,
+                                     [self.rounds] * len(passwords), chunksize=chunksize))
+        if self.hasher is not None:
+            return self.hasher.hash_many(passwords)
+        return [hash_password(password, self.rounds) for password in passwords]
+
+    def _attach(self, rows, now):
+        """Associa os usuários recém-criados à account (executemany + contadores)"""
+        emails = [row['email'] for row in rows]
+        user_ids = db.session.execute(
+            db.select(User.id).where(User.email.in_(emails))
+        ).scalars().all()
+
+        db.session.execute(user_accounts.insert(), [{
+            'user_id': user_id,
+            'account_id': self.account.id,
+            'role_in_account': self.role_in_account,
+            'created_at': now,
+            'is_active': True
+        } for user_id in user_ids])
+
+        admins = len(user_ids) if self.role_in_account in ADMIN_ROLES else 0
+        db.session.execute(
+            Account.__table__.update().where(Account.id == self.account.id).values(
+                member_count=Account.member_count + len(user_ids),
+                admin_role_count=Account.admin_role_count + admins
+            )
+        )
+
+    def _validate(self, batch, report):
+        """Valida e normaliza as linhas do lote; erros vão para o relatório"""
+        valid = []
+        seen = set()
+        for line_no, data in batch:
+            if isinstance(data, Exception):
+                self._error(report, line_no, None, str(data))
+                continue
+
+            email = str(data.get('email') or '').strip().lower()
+            password = str(data.get('password') or '')
+            first_name = str(data.get('first_name') or '').strip()
+            last_name = str(data.get('last_name') or '').strip()
+            role = str(data.get('role') or 'user').strip().lower()
+
+            if not all([email, password, first_name, last_name]):
+                self._error(report, line_no, email, 'email, password, first_name e last_name são obrigatórios')
+                continue
+            if '@' not in email or len(email) > 120:
+                self._error(report, line_no, email, 'Email inválido')
+                continue
+            if len(first_name) > 50 or len(last_name) > 50:
+                self._error(report, line_no, email, 'Nome excede 50 caracteres')
+                continue
+            if len(password.encode('utf-8')) > 72:
+                self._error(report, line_no, email, 'Senha excede 72 bytes (limite do bcrypt)')
+                continue
+            if role not in ROLE_MAP:
+                self._error(report, line_no, email, f'Role inválido: {role}')
+                continue
+            if email in seen:
+                report.skipped += 1
+                continue
+
+            seen.add(email)
+            valid.append({
+                'line': line_no,
+                'email': email,
+                'password': password,
+                'first_name': first_name,
+                'last_name': last_name,
+                'role': ROLE_MAP[role]
+            })
+        return valid
+
+    @staticmethod
+    def _error(report, line_no, email, message):
+        report.add_error(line_no, email, message)
@@ -0,0 +1,141 @@
+import atexit
+import logging
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import bindparam
+from models import db, User
+
+logger = logging.getLogger(__name__)
+
+
+class TimestampBuffer:
+    """
+    Buffer write-behind para timestamps do hot path (last_login, last_seen).
+
+    As chamadas a touch() só atualizam um dict em memória, mantendo o valor
+    mais recente por (campo, usuário). Uma thread grava tudo a cada
+    WRITE_BEHIND_INTERVAL segundos (ou ao atingir WRITE_BEHIND_MAX_ENTRIES)
+    com um UPDATE em lote por campo, fora da transação do request.
+    O buffer é gravado também no encerramento do processo.
+
+    Leitores (time_ago, to_dict, cache de usuários) podem ver valores com
+    alguns segundos de atraso.
+    """
+
+    FIELDS = ('last_login', 'last_seen')
+
+    def __init__(self, app=None, interval=5, max_entries=500):
+        self.interval = interval
+        self.max_entries = max_entries
+        self._app = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.interval = app.config.get('WRITE_BEHIND_INTERVAL', self.interval)
+        self.max_entries = app.config.get('WRITE_BEHIND_MAX_ENTRIES', self.max_entries)
+        self._app = app
+        app.extensions['timestamp_buffer'] = self
+        atexit.register(self.flush)
+
+    # =============================================================================
+    # REGISTRO
+    # =============================================================================
+
+    def touch(self, user_id, field, value=None):
+        """Agenda a gravação de `field` para o usuário (coalescendo repetições)"""
+        if field not in self.FIELDS:
+            raise ValueError(f'Campo não suportado: {field}')
+        value = value or datetime.utcnow()
+
+        with self._lock:
+            key = (field, user_id)
+            current = self._pending.get(key)
+            if current is None or value > current:
+                self._pending[key] = value
+            size = len(self._pending)
+
+        if self.interval <= 0:
+            # Sem intervalo: grava imediatamente (útil em testes)
+            self.flush()
+            return
+
+        self._ensure_thread()
+        if size >= self.max_entries:
+            self._wakeup.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    # =============================================================================
+    # GRAVAÇÃO
+    # =============================================================================
+
+    def flush(self):
+        """Grava o buffer no banco; retorna o número de linhas enviadas"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending or self._app is None:
+                return 0
+
+            by_field = {}
+            for (field, user_id), value in pending.items():
+                by_field.setdefault(field, []).append({'b_id': user_id, 'b_value': value})
+
+            table = User.__table__
+            try:
+                with self._app.app_context():
+                    with db.engine.begin() as connection:
+                        for field, params in by_field.items():
+                            statement = table.update().where(
+                                table.c.id == bindparam('b_id')
+                            ).values({
+                                field: bindparam('b_value'),
+                                # Não tocar updated_at (onupdate) por causa de um timestamp de acesso
+                                'updated_at': table.c.updated_at
+                            })
+                            connection.execute(statement, params)
+            except Exception:
+                logger.exception('Falha ao gravar timestamps; mantidos para a próxima tentativa')
+                self._restore(pending)
+                return 0
+            return len(pending)
+
+    def _restore(self, pending):
+        with self._lock:
+            for key, value in pending.items():
+                current = self._pending.get(key)
+                if current is None or value > current:
+                    self._pending[key] = value
+
+    def _ensure_thread(self):
+        # A thread não sobrevive a fork: cada worker inicia a sua
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name='timestamp-write-behind', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+# Instância global
+timestamp_buffer = TimestampBuffer()
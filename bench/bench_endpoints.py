@@ -0,0 +1,240 @@
+"""
+Benchmark dos endpoints mais acessados contra um banco populado.
+
+Monta a aplicação (DevelopmentConfig) sobre um SQLite em memória ou em
+arquivo, popula accounts × usuários × memberships e executa pelo test client:
+login, /account/<id>/dashboard, /super-admin/accounts/,
+/super-admin/users/?search= e /user/accounts. Mostra latência p50/p95/p99,
+requisições/s e queries por requisição.
+
+Uso:
+    python bench/bench_endpoints.py [--accounts 100] [--users 2000] [--members-per-account 10]
+                                    [--requests 200] [--db arquivo.db]
+                                    [--save baseline.json] [--compare baseline.json] [--threshold 25]
+
+Com --compare, sai com código 1 se algum cenário ficar mais lento que o
+baseline além de --threshold % (p50 ou p95) ou fizer mais queries.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'app'))
+
+PASSWORD = 'senha-de-benchmark'
+SEARCH_TERMS = ['silva', 'mariana', 'oliveira.7', 'bench.local', 'xx']
+
+
+def configure_environment(database_url):
+    """Variáveis lidas pela Config antes de importar a aplicação"""
+    os.environ['DEV_DATABASE_URL'] = database_url
+    os.environ.setdefault('SESSION_BACKEND', 'memory')
+    os.environ.setdefault('PASSWORD_HASH_ROUNDS', '4')
+    # Sem flush do write-behind no meio da medição (gravado no final)
+    os.environ.setdefault('WRITE_BEHIND_INTERVAL', '3600')
+    os.environ.setdefault('SQL_PROFILER_ENABLED', 'False')
+
+
+# =============================================================================
+# DADOS
+# =============================================================================
+
+def seed(db, accounts, users, members_per_account, password_hash):
+    """
+    Popula pelo mesmo Seeder do `flask seed` (semente fixa): super admin
+    (id 1), owners administradores (ids 2..accounts+1, um por account) e
+    membros distribuídos entre as accounts. Retorna {id: email}.
+    """
+    from models import User
+    from services.seed import Seeder
+
+    Seeder(accounts=accounts, users=max(users, accounts + 1), members_per_account=members_per_account,
+           password_hash=password_hash, seed=42, email_domain='bench.local').run()
+    return dict(db.session.execute(db.select(User.id, User.email)).all())
+
+
+# =============================================================================
+# EXECUÇÃO
+# =============================================================================
+
+def login(client, email):
+    response = client.post('/login', data={'email': email, 'password': PASSWORD})
+    assert response.status_code == 302, f'login de {email} falhou ({response.status_code})'
+    # Consome o flash de boas-vindas (senão o GET condicional é ignorado)
+    client.get('/user/current-account')
+    return client
+
+
+def measure(name, requests, run, counter):
+    """Executa `run(i)` `requests` vezes; retorna as métricas do cenário"""
+    run(0)  # aquecimento (templates, caches de processo)
+    latencies = []
+    queries = []
+    started = time.perf_counter()
+    for i in range(requests):
+        counter['n'] = 0
+        start = time.perf_counter()
+        response = run(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(counter['n'])
+        assert response.status_code < 400, f'{name}: HTTP {response.status_code}'
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'p50_ms': round(_percentile(latencies, 50), 3),
+        'p95_ms': round(_percentile(latencies, 95), 3),
+        'p99_ms': round(_percentile(latencies, 99), 3),
+        'rps': round(requests / elapsed, 1),
+        'queries_avg': round(sum(queries) / len(queries), 2),
+        'queries_max': max(queries)
+    }
+
+
+def _percentile(values, pct):
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def run_scenarios(app, db, args, emails):
+    from sqlalchemy import event
+
+    counter = {'n': 0}
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute',
+                         lambda *a, **k: counter.__setitem__('n', counter['n'] + 1))
+
+    rng = random.Random(7)
+    owner_id = 2
+    member_client = login(app.test_client(), emails[owner_id])
+    admin_client = login(app.test_client(), emails[1])
+    regular = sorted(emails)[args.accounts + 1:]
+
+    def do_login(i):
+        email = emails[rng.choice(regular)]
+        return app.test_client().post('/login', data={'email': email, 'password': PASSWORD})
+
+    scenarios = {
+        'login': do_login,
+        'account_dashboard': lambda i: member_client.get(f'/account/{owner_id - 1}/dashboard'),
+        'user_accounts': lambda i: member_client.get('/user/accounts'),
+        'super_admin_accounts': lambda i: admin_client.get('/super-admin/accounts/'),
+        'super_admin_users_search': lambda i: admin_client.get(
+            f'/super-admin/users/?search={SEARCH_TERMS[i % len(SEARCH_TERMS)]}'),
+    }
+
+    results = {}
+    for name, run in scenarios.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = measure(name, args.requests, run, counter)
+        r = results[name]
+        print(f'{name:<26} p50 {r["p50_ms"]:8.2f}  p95 {r["p95_ms"]:8.2f}  p99 {r["p99_ms"]:8.2f} ms'
+              f'  {r["rps"]:8.1f} req/s  queries {r["queries_avg"]:.1f} (máx {r["queries_max"]})')
+    return results
+
+
+# =============================================================================
+# BASELINE
+# =============================================================================
+
+def compare(results, baseline, threshold):
+    """Lista de regressões em relação ao baseline"""
+    regressions = []
+    for name, base in baseline.get('scenarios', {}).items():
+        current = results.get(name)
+        if current is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            limit = base[metric] * (1 + threshold / 100)
+            if current[metric] > limit:
+                regressions.append(f'{name}: {metric} {current[metric]:.2f} > {limit:.2f} '
+                                   f'(baseline {base[metric]:.2f} + {threshold:g}%)')
+        # Queries são determinísticas: qualquer aumento é regressão
+        if current['queries_avg'] > base['queries_avg'] + 0.5:
+            regressions.append(f'{name}: queries {current["queries_avg"]} > baseline {base["queries_avg"]}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--accounts', type=int, default=100)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--members-per-account', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=200, help='requisições medidas por cenário')
+    parser.add_argument('--db', default=None, help='arquivo SQLite (padrão: banco em memória)')
+    parser.add_argument('--only', nargs='+', default=None, help='cenários a executar')
+    parser.add_argument('--save', default=None, help='grava os resultados como baseline JSON')
+    parser.add_argument('--compare', default=None, help='baseline JSON para comparar')
+    parser.add_argument('--threshold', type=float, default=25.0, help='tolerância de latência em %%')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='bench-')
+    path = os.path.abspath(args.db) if args.db else None
+    if path and os.path.exists(path):
+        os.unlink(path)
+    os.environ.setdefault('SESSION_SQLITE_PATH', os.path.join(directory, 'sessions.db'))
+    configure_environment(f'sqlite:///{path}' if path else 'sqlite://')
+
+    from app import app
+    from models import db
+    from services.passwords import password_hasher
+    from services.write_behind import timestamp_buffer
+
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        emails = seed(db, args.accounts, args.users, args.members_per_account,
+                     password_hasher.hash(PASSWORD))
+        users = len(emails)
+        print(f'dataset: {args.accounts} accounts, {users} usuários, '
+              f'{args.members_per_account} membros/account ({time.perf_counter() - started:.1f}s)')
+
+    try:
+        results = run_scenarios(app, db, args, emails)
+    finally:
+        with app.app_context():
+            timestamp_buffer.flush()
+
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'accounts': args.accounts,
+            'users': users,
+            'members_per_account': args.members_per_account,
+            'requests': args.requests,
+            'database': 'file' if path else 'memory'
+        },
+        'scenarios': results
+    }
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'baseline gravado em {args.save}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print('\nREGRESSÕES:')
+            for line in regressions:
+                print(f'  {line}')
+            sys.exit(1)
+        print(f'\nsem regressões em relação a {args.compare}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark do hashing de senhas: logins/segundo (verificações bcrypt) por core.
+
+Uso:
+    python bench/bench_passwords.py [--clients 32] [--seconds 5] [--rounds N]
+
+Sem --rounds o custo é calibrado como na inicialização da aplicação.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from services.passwords import PasswordHasher, PasswordHasherBusy
+
+
+def run(hasher, clients, seconds):
+    password = 'senha-de-benchmark'
+    password_hash = hasher.hash(password)
+    counts = [0] * clients
+    rejected = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def client(index):
+        while time.perf_counter() < deadline:
+            try:
+                assert hasher.verify(password_hash, password)
+                counts[index] += 1
+            except PasswordHasherBusy:
+                rejected[index] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sum(counts), sum(rejected), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=32, help='threads simulando logins simultâneos')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--rounds', type=int, default=None, help='custo bcrypt (padrão: calibrado)')
+    parser.add_argument('--target-ms', type=int, default=250, help='alvo da calibração')
+    parser.add_argument('--workers', type=int, default=None, help='threads do pool (padrão: nº de CPUs)')
+    args = parser.parse_args()
+
+    rounds = args.rounds or PasswordHasher.calibrate(target_ms=args.target_ms)
+    hasher = PasswordHasher(rounds=rounds, workers=args.workers, max_queue=args.clients)
+    cores = os.cpu_count() or 1
+
+    print(f'bcrypt rounds={rounds} workers={hasher.workers} clients={args.clients} cores={cores}')
+    try:
+        logins, rejected, elapsed = run(hasher, args.clients, args.seconds)
+    finally:
+        hasher.shutdown()
+
+    per_second = logins / elapsed
+    print(f'logins:        {logins} em {elapsed:.2f}s')
+    print(f'logins/s:      {per_second:.1f}')
+    print(f'logins/s/core: {per_second / min(cores, hasher.workers):.1f}')
+    if rejected:
+        print(f'recusados (fila cheia): {rejected}')
+
+
+if __name__ == '__main__':
+    main()
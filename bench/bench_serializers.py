@@ -0,0 +1,130 @@
+"""
+Benchmark da serialização de listas: to_dict() por objeto vs serializers em lote,
+e encoder JSON padrão vs FastJSONProvider (orjson).
+
+Uso:
+    python bench/bench_serializers.py [--objects 1000] [--members 5] [--repeat 3]
+
+Usa um SQLite em memória populado direto pelo Core (sem bcrypt).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from flask import Flask
+from sqlalchemy import event
+from models import db, User, UserRole, Account, AccountStatus, user_accounts
+from services.serializers import FastJSONProvider, orjson, serialize_accounts, serialize_users
+
+
+def create_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    return app
+
+
+def seed(objects, members):
+    users = db.metadata.tables['users']
+    accounts = db.metadata.tables['accounts']
+    db.session.execute(users.insert(), [{
+        'email': f'user{i}@bench.local', 'password_hash': 'x',
+        'first_name': f'Nome{i}', 'last_name': f'Sobrenome{i}',
+        'role': UserRole.SUPER_ADMIN if i % 100 == 0 else UserRole.USER,
+        'account_count': members
+    } for i in range(1, objects + 1)])
+    db.session.execute(accounts.insert(), [{
+        'name': f'Account {i}', 'subdomain': f'account{i}', 'status': AccountStatus.ACTIVE,
+        'owner_id': i, 'created_by': 1, 'member_count': members, 'admin_role_count': 1
+    } for i in range(1, objects + 1)])
+    db.session.execute(user_accounts.insert(), [{
+        'account_id': a, 'user_id': (a + offset - 1) % objects + 1,
+        'role_in_account': 'owner' if offset == 0 else 'user'
+    } for a in range(1, objects + 1) for offset in range(members)])
+    db.session.commit()
+
+
+def legacy_account_dict(account):
+    """Account.to_dict() como era antes dos serializers em lote"""
+    return {
+        'id': account.id,
+        'name': account.name,
+        'subdomain': account.subdomain,
+        'status': account.status.value,
+        'is_active': account.is_active,
+        'owner_id': account.owner_id,
+        'owner_name': account.owner.get_full_name() if account.owner else None,
+        'user_count': account.get_user_count(),
+        'admin_count': len(account.get_admins()),
+        'created_at': account.created_at.isoformat() if account.created_at else None,
+        'updated_at': account.updated_at.isoformat() if account.updated_at else None
+    }
+
+
+def measure(label, load, serialize, counter, repeat):
+    best = None
+    for _ in range(repeat):
+        db.session.remove()
+        objects = load()
+        counter['n'] = 0
+        start = time.perf_counter()
+        data = serialize(objects)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, counter['n'])
+    print(f'{label:<38} {best[0] * 1000:9.1f} ms  {best[1]:6d} queries')
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--objects', type=int, default=1000, help='nº de accounts e de usuários')
+    parser.add_argument('--members', type=int, default=5, help='membros por account')
+    parser.add_argument('--repeat', type=int, default=3, help='execuções (vale a melhor)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        seed(args.objects, args.members)
+        counter = {'n': 0}
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda *a, **k: counter.__setitem__('n', counter['n'] + 1))
+
+        def load_accounts():
+            return Account.query.order_by(Account.id).all()
+
+        def load_users():
+            return User.query.order_by(User.id).all()
+
+        print(f'{args.objects} accounts / usuários, {args.members} membros por account')
+        measure('accounts: to_dict() legado', load_accounts,
+                lambda rows: [legacy_account_dict(a) for a in rows], counter, args.repeat)
+        measure('accounts: to_dict() por objeto', load_accounts,
+                lambda rows: [a.to_dict() for a in rows], counter, args.repeat)
+        accounts = measure('accounts: serialize_accounts()', load_accounts,
+                           serialize_accounts, counter, args.repeat)
+        measure('users: to_dict() por objeto', load_users,
+                lambda rows: [u.to_dict() for u in rows], counter, args.repeat)
+        users = measure('users: serialize_users()', load_users,
+                        serialize_users, counter, args.repeat)
+
+        payload = {'accounts': accounts, 'users': users}
+        provider = FastJSONProvider(app)
+        for label, dumps in (('json.dumps', lambda: json.dumps(payload)),
+                             ('FastJSONProvider.dumps', lambda: provider.dumps(payload))):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                dumps()
+            elapsed = (time.perf_counter() - start) / args.repeat
+            print(f'{label:<38} {elapsed * 1000:9.1f} ms')
+        if orjson is None:
+            print('(orjson não instalado: FastJSONProvider usa o encoder padrão)')
+
+
+if __name__ == '__main__':
+    main()
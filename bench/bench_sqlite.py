@@ -0,0 +1,130 @@
+"""
+Benchmark dos perfis SQLite (SQLITE_PROFILE): leituras e escritas concorrentes
+em um arquivo com o schema da aplicação.
+
+Uso:
+    python bench/bench_sqlite.py [--rows 20000] [--readers 8] [--writers 2] [--seconds 5]
+
+Para cada perfil: leitores fazem buscas por id e listagens curtas de users,
+escritores fazem UPDATEs de uma linha com commit (como o write-behind e o
+login). Mostra operações/s e quantas esperaram mais que 100 ms pelo lock.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from sqlalchemy import create_engine, event, text
+from models import db
+from services.sqlite_tuning import SQLITE_PROFILES, apply_pragmas
+
+SLOW_MS = 100
+
+
+def create_database(path, rows):
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine)
+    users = db.metadata.tables['users']
+    with engine.begin() as connection:
+        connection.execute(users.insert(), [{
+            'email': f'user{i}@bench.local', 'password_hash': 'x',
+            'first_name': f'Nome{i}', 'last_name': f'Sobrenome{i}',
+            'role': 'USER', 'account_count': 0
+        } for i in range(1, rows + 1)])
+    engine.dispose()
+
+
+def create_profile_engine(path, profile, pool_size):
+    engine = create_engine(f'sqlite:///{path}', pool_size=pool_size, max_overflow=0)
+    pragmas = SQLITE_PROFILES[profile]
+    if pragmas:
+        event.listen(engine, 'connect', lambda dbapi_connection, record: apply_pragmas(dbapi_connection, pragmas))
+    return engine
+
+
+def run(engine, rows, readers, writers, seconds):
+    deadline = time.perf_counter() + seconds
+    stats = {'reads': [0] * readers, 'writes': [0] * writers,
+             'slow_reads': [0] * readers, 'slow_writes': [0] * writers, 'errors': [0] * (readers + writers)}
+
+    def reader(index):
+        rng = random.Random(index)
+        with engine.connect() as connection:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    connection.execute(text('SELECT * FROM users WHERE id = :id'),
+                                       {'id': rng.randint(1, rows)}).fetchall()
+                    connection.execute(text('SELECT id, email FROM users WHERE id > :id ORDER BY id LIMIT 20'),
+                                       {'id': rng.randint(1, rows)}).fetchall()
+                    connection.rollback()
+                except Exception:
+                    stats['errors'][index] += 1
+                    connection.rollback()
+                    continue
+                stats['reads'][index] += 1
+                if (time.perf_counter() - start) * 1000 > SLOW_MS:
+                    stats['slow_reads'][index] += 1
+
+    def writer(index):
+        rng = random.Random(1000 + index)
+        with engine.connect() as connection:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    connection.execute(text('UPDATE users SET last_seen = CURRENT_TIMESTAMP WHERE id = :id'),
+                                       {'id': rng.randint(1, rows)})
+                    connection.commit()
+                except Exception:
+                    stats['errors'][readers + index] += 1
+                    connection.rollback()
+                    continue
+                stats['writes'][index] += 1
+                if (time.perf_counter() - start) * 1000 > SLOW_MS:
+                    stats['slow_writes'][index] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {key: sum(values) for key, values in stats.items()}, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--profiles', nargs='+', default=list(SQLITE_PROFILES), choices=list(SQLITE_PROFILES))
+    args = parser.parse_args()
+
+    print(f'{args.rows} users, {args.readers} leitores, {args.writers} escritores, {args.seconds}s por perfil')
+    for profile in args.profiles:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.db')
+            create_database(path, args.rows)
+            engine = create_profile_engine(path, profile, args.readers + args.writers)
+            try:
+                result, elapsed = run(engine, args.rows, args.readers, args.writers, args.seconds)
+            finally:
+                engine.dispose()
+
+        print(f'\n[{profile}]')
+        print(f'  leituras/s:  {result["reads"] / elapsed:10.1f}   (> {SLOW_MS} ms: {result["slow_reads"]})')
+        print(f'  escritas/s:  {result["writes"] / elapsed:10.1f}   (> {SLOW_MS} ms: {result["slow_writes"]})')
+        if result['errors']:
+            print(f'  erros (database is locked): {result["errors"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -21,12 +21,81 @@ class Config:
         'pool_pre_ping': True   # Verificar conexão antes de usar
     }
     
+    # Réplicas de leitura: URLs separadas por vírgula viram os binds replica1,
+    # replica2... usados pelas views com @read_replica
+    SQLALCHEMY_BINDS = {
+        f'replica{i}': url
+        for i, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), 1)
+    }
+    REPLICA_BINDS = list(SQLALCHEMY_BINDS)
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))  # primário após escrever
+    
+    # SQLite: perfil de PRAGMAs aplicado em cada conexão ('performance' = WAL,
+    # synchronous=NORMAL, mmap, cache de 64 MB; 'default' = padrão do SQLite)
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'performance')
+    SQLITE_PRAGMAS = {}  # sobrescreve valores do perfil, ex: {'cache_size': -131072}
+    SQLITE_OPTIMIZE_INTERVAL = int(os.environ.get('SQLITE_OPTIMIZE_INTERVAL', 3600))  # segundos, 0 = nunca
+    
     # Configurações de Session/Cookie
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
     SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
     
+    # Backend de sessions: 'sqlite' (arquivo compartilhado entre workers), 'memory' ou 'cookie'
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'sqlite')
+    SESSION_SQLITE_PATH = os.environ.get('SESSION_SQLITE_PATH')  # padrão: instance/sessions.db
+    SESSION_LRU_SIZE = int(os.environ.get('SESSION_LRU_SIZE', 4096))
+    SESSION_LRU_TTL = int(os.environ.get('SESSION_LRU_TTL', 5))  # segundos
+    
+    # Cache do user_loader (snapshot do usuário por processo)
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))  # segundos
+    
+    # Intervalo de recálculo das estatísticas do painel Super Admin
+    SUPER_ADMIN_STATS_TTL = int(os.environ.get('SUPER_ADMIN_STATS_TTL', 30))  # segundos
+    
+    # Listagens do Super Admin (paginação por cursor)
+    ADMIN_LIST_PER_PAGE = 20
+    # Total das listagens (COUNT, em cache por N segundos): opt-in, pois cada
+    # busca nova conta a tabela inteira. 0 = sem total
+    ADMIN_LIST_COUNT_TTL = int(os.environ.get('ADMIN_LIST_COUNT_TTL', 0))
+    
+    # Exportação em streaming (NDJSON/CSV): linhas por lote lido do cursor
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    
+    # Operações em lote nos membros de uma account (itens por requisição)
+    BULK_MEMBERSHIP_MAX_ITEMS = int(os.environ.get('BULK_MEMBERSHIP_MAX_ITEMS', 10000))
+    
+    # Hashing de senhas (bcrypt em pool de threads, custo calibrado no startup)
+    PASSWORD_HASH_ROUNDS = int(os.environ.get('PASSWORD_HASH_ROUNDS', 0))  # 0 = calibrar
+    PASSWORD_HASH_TARGET_MS = int(os.environ.get('PASSWORD_HASH_TARGET_MS', 250))
+    PASSWORD_HASH_MIN_ROUNDS = 12  # custo do BCRYPT_LOG_ROUNDS original; nunca calibrar abaixo
+    PASSWORD_HASH_MAX_ROUNDS = 15
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0))  # 0 = nº de CPUs
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 64))
+    
+    # Cache de fragmentos de template ({% cache %}: sidebar/switcher)
+    FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE', 2048))
+    FRAGMENT_CACHE_TTL = int(os.environ.get('FRAGMENT_CACHE_TTL', 300))  # segundos
+    
+    # Write-behind de last_login/last_seen (UPDATE em lote)
+    WRITE_BEHIND_INTERVAL = int(os.environ.get('WRITE_BEHIND_INTERVAL', 5))  # segundos
+    WRITE_BEHIND_MAX_ENTRIES = int(os.environ.get('WRITE_BEHIND_MAX_ENTRIES', 500))
+    
+    # Arquivos estáticos com hash (flask assets build): cache imutável de 1 ano
+    STATIC_ASSETS_MAX_AGE = 31536000
+    
+    # Invalida os ETags das páginas a cada deploy. Padrão: hash do código e
+    # dos templates (services.conditional.init_conditional); env só sobrescreve
+    ETAG_SALT = os.environ.get('ETAG_SALT') or os.environ.get('RELEASE')
+    
+    # Profiler de SQL por request (Server-Timing, log JSON e /super-admin/sql-profile)
+    SQL_PROFILER_ENABLED = os.environ.get('SQL_PROFILER_ENABLED', 'False').lower() == 'true'
+    SQL_PROFILER_HEADERS = True     # header Server-Timing nas respostas
+    SQL_PROFILER_N_PLUS_ONE = 5     # repetições do mesmo statement para marcar N+1
+    SQL_PROFILER_WINDOW = 200       # amostras por endpoint no resumo
+    
     # Configurações de Upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB máximo
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
@@ -56,23 +125,31 @@ class DevelopmentConfig(Config):
     """Configuração para desenvolvimento"""
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DEV_DATABASE_URL') or 'sqlite:///ceotur_dev.db'
+    SQL_PROFILER_ENABLED = os.environ.get('SQL_PROFILER_ENABLED', 'True').lower() == 'true'
 
 class ProductionConfig(Config):
     """Configuração para produção"""
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')  # PostgreSQL em produção
     SESSION_COOKIE_SECURE = True
+    # Sem padrão: o store 'sqlite' é por host e não serve a vários servidores
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND')
     
     def __init__(self):
         # Validação só quando a config é realmente usada
         if not os.environ.get('SECRET_KEY'):
             raise ValueError("SECRET_KEY deve ser definida em produção!")
+        if not os.environ.get('SESSION_BACKEND'):
+            raise ValueError("SESSION_BACKEND deve ser definido em produção!")
 
 class TestingConfig(Config):
     """Configuração para tests"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    PASSWORD_HASH_ROUNDS = 4  # Mínimo do bcrypt, para testes rápidos
+    WRITE_BEHIND_INTERVAL = 0  # Grava os timestamps imediatamente
+    SESSION_BACKEND = 'memory'
 
 # Mapeamento de configurações
 config = {
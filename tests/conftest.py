@@ -0,0 +1,36 @@
+"""
+Aplicação de teste: DevelopmentConfig sobre SQLite em memória, sessions em
+memória e bcrypt com custo mínimo. As variáveis são lidas pela Config, então
+precisam estar definidas antes de importar a aplicação.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'app'))
+
+os.environ['DEV_DATABASE_URL'] = 'sqlite://'
+os.environ['SESSION_BACKEND'] = 'memory'
+os.environ['PASSWORD_HASH_ROUNDS'] = '4'
+os.environ['WRITE_BEHIND_INTERVAL'] = '3600'
+os.environ['SQL_PROFILER_ENABLED'] = 'False'
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import app
+    return app
+
+
+@pytest.fixture
+def login(app):
+    """Test client já autenticado como o usuário `user_id`"""
+    def login(user_id):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+        return client
+    return login
@@ -0,0 +1,130 @@
+"""
+EXPLAIN QUERY PLAN (SQLite) das queries mais frequentes.
+
+As queries são capturadas (before_cursor_execute) enquanto as próprias
+views e métodos rodam sobre um banco populado pelo Seeder, então qualquer
+mudança em keyset_paginate, Account.get_members, serializers ou nas rotas
+passa por aqui. Falha se alguma tabela for lida por inteiro (SCAN sem
+índice) ou se uma listagem paginada precisar ordenar em B-tree temporária
+em vez de seguir o índice (created_at, id).
+"""
+import re
+from html import unescape
+
+import pytest
+from sqlalchemy import event
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+TEMP_SORT = re.compile(r'USE TEMP B-TREE FOR (?:ORDER BY|RIGHT PART OF ORDER BY|LAST TERM OF ORDER BY)')
+NEXT_PAGE = re.compile(r'href="([^"]*[?&]after=[^"]*)"')
+
+# Agregados globais por definição: versão de accounts/memberships dos
+# validadores de GET condicional e do cache de fragmentos
+GLOBAL_AGGREGATES = (
+    re.compile(r'^SELECT count\(accounts\.id\) AS count_1, max\(accounts\.updated_at\) AS max_1\b'),
+)
+
+USERS = 3000
+ACCOUNTS = 100
+SUPER_ADMIN_ID = 1
+OWNER_ID = 2  # owner da account 1 (Seeder: super admins, depois um owner por account)
+ACCOUNT_ID = 1
+
+# (cenário, usuário, URL, tabelas que podem ser varridas, listagem paginada)
+PAGES = [
+    ('users_list', SUPER_ADMIN_ID, '/super-admin/users/', (), True),
+    ('users_by_role', SUPER_ADMIN_ID, '/super-admin/users/?role=administrador', (), True),
+    ('users_by_role_user', SUPER_ADMIN_ID, '/super-admin/users/?role=user', (), True),
+    ('accounts_list', SUPER_ADMIN_ID, '/super-admin/accounts/', (), True),
+    ('accounts_by_status', SUPER_ADMIN_ID, '/super-admin/accounts/?status=active', (), True),
+    ('account_view', SUPER_ADMIN_ID, f'/super-admin/accounts/{ACCOUNT_ID}', (), False),
+    # manage_users: a lista de todos os usuários é varrida por definição,
+    # mas o NOT EXISTS por usuário tem que usar a PK de user_accounts
+    ('manage_users', SUPER_ADMIN_ID, f'/super-admin/accounts/{ACCOUNT_ID}/users', ('users',), False),
+    ('account_dashboard', OWNER_ID, f'/account/{ACCOUNT_ID}/dashboard', (), False),
+    ('user_accounts', OWNER_ID, '/user/accounts', (), False),
+]
+
+
+@pytest.fixture(scope='module')
+def engine(app):
+    from models import db
+    from services.seed import Seeder
+    from services.write_behind import timestamp_buffer
+
+    with app.app_context():
+        db.create_all()
+        Seeder(accounts=ACCOUNTS, users=USERS, members_per_account=20,
+               password_hash='x', seed=42).run()
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql('ANALYZE')
+        yield db.engine
+        # last_seen dos requests acumulado no buffer: gravar antes de apagar as tabelas
+        timestamp_buffer.flush()
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def captured(engine):
+    """SELECTs executados (statement, parâmetros) enquanto o teste roda"""
+    statements = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', capture)
+
+
+def problems(engine, statements, allowed_scans=(), ordered=False):
+    """Problemas de plano por statement capturado"""
+    found = []
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            sql = ' '.join(statement.split())
+            plan = [row[3] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+            for line in plan:
+                match = FULL_SCAN.match(line.strip())
+                if match and match.group(1) not in allowed_scans \
+                        and not any(pattern.match(sql) for pattern in GLOBAL_AGGREGATES):
+                    found.append(f'varredura completa de {match.group(1)}: {sql[:200]}')
+                if ordered and TEMP_SORT.search(line):
+                    found.append(f'ordenação em B-tree temporária: {sql[:200]}')
+    return found
+
+
+@pytest.mark.parametrize('name, user_id, url, allowed_scans, ordered', PAGES, ids=[page[0] for page in PAGES])
+def test_page_queries_use_indexes(engine, captured, login, name, user_id, url, allowed_scans, ordered):
+    client = login(user_id)
+    response = client.get(url)
+    assert response.status_code == 200
+
+    if ordered:
+        # Segunda página: filtro do cursor (created_at, id) no mesmo índice
+        link = NEXT_PAGE.search(response.get_data(as_text=True))
+        assert link, 'listagem sem link para a próxima página'
+        assert client.get(unescape(link.group(1))).status_code == 200
+
+    assert captured, 'nenhuma query capturada'
+    assert problems(engine, captured, allowed_scans, ordered) == []
+
+
+def test_membership_queries_use_indexes(app, engine, captured):
+    from models import db, Account
+    from services.serializers import serialize_accounts
+
+    with app.test_request_context():
+        account = db.session.get(Account, ACCOUNT_ID)
+        others = Account.query.filter(Account.id.in_([ACCOUNT_ID, ACCOUNT_ID + 1])).all()
+        captured.clear()
+
+        account.get_members(refresh=True)
+        account.get_users()
+        Account.get_member_counts([ACCOUNT_ID, ACCOUNT_ID + 1])
+        serialize_accounts(others)
+
+    assert captured, 'nenhuma query capturada'
+    assert problems(engine, captured) == []